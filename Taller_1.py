@@ -1,6 +1,7 @@
 import numpy as np
 import modos_opticaRayos as ray
 import modos_opticaOndulatoria as ond
+import modos_guiados
 
 
 def n_efectivo(n_core, angulo):
@@ -21,8 +22,9 @@ espesor = 1 #espesor del guia de onda
 longitud_onda = 1 #longitud de onda usada en la fibra optica
 
 ''' calculo de los valores solucion de la ecuacion trascendente'''
+numero_modos = modos_guiados.numero_modos(n_core, n_cleavy, espesor, longitud_onda) #cantidad de modos guiados segun la frecuencia normalizada V
 print("OPTICA DE RAYOS \n")
-for modo in range(0, 3): #se recorren los valores de modos desde el 0 hasta el 3
+for modo in range(numero_modos): #se recorren solo los modos que el guia de onda puede guiar
     angulo_optimo, valor_min = ray.optimizar_TERayos(n_core, n_cleavy, espesor, modo, n_substract, longitud_onda) #calculo del angulo para el modo TM
     ''' printeamos por consola el valor del angulo y de la ecuacion trascendednte en ese angulo. Si el valor de la ecuacion no es cero, entonces ese modo no es 
     permitido en el guia de onda '''
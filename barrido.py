@@ -0,0 +1,41 @@
+import numpy as np
+import modos_guiados
+
+def barrido_modos(longitud_onda, espesor, n_core, n_cleavy, n_substract=None, modelo='rayos', modos_max=None):
+    ''' funcion que calcula los indices efectivos de los modos TE y TM sobre un barrido de parametros. Las entradas pueden ser escalares o
+    arreglos de numpy y hacen broadcasting entre si como en un ufunc (por ejemplo longitud_onda[:, None] y espesor[None, :] generan un mapa 2D)
+
+    Entradas:
+    longitud_onda (float o array) == longitud de onda de la iluminacion incidente en micras
+    espesor (float o array) == ancho del nucleo del guia de onda (en micras)
+    n_core (float o array) == indice de refraccion del nucleo del guia de onda
+    n_cleavy (float o array) == indice de refraccion del recubrimiento del guia de onda
+    n_substract (float o array, opcional) == indice de refraccion del sustrato (por defecto es el mismo valor que el recubrimiento)
+    modelo (str) == 'rayos' para optica de rayos u 'ondas' para optica ondulatoria
+    modos_max (int, opcional) == numero de modos por polarizacion que se calculan, por defecto todos los que puede guiar el punto mas multimodo
+
+    Retorna:
+    resultado (structured array) == arreglo con la forma del broadcasting de las entradas y los campos 'longitud_onda', 'espesor', 'n_core',
+    'n_cleavy', 'n_substract' (parametros de cada punto), 'TE' y 'TM' (indice efectivo de cada modo, de tamano modos_max, nan si no es guiado) '''
+
+    if modelo not in ('rayos', 'ondas'):
+        raise ValueError(f"modelo desconocido: {modelo}, debe ser 'rayos' u 'ondas'")
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+    longitud_onda, espesor, n_core, n_cleavy, n_substract = np.broadcast_arrays(*[np.asarray(parametro, dtype=float) for parametro in (longitud_onda, espesor, n_core, n_cleavy, n_substract)])
+    forma = longitud_onda.shape
+
+    ''' numero de modos: por defecto los que guia el punto mas multimodo segun su frecuencia normalizada V '''
+    if modos_max is None:
+        modos_max = int(modos_guiados.numero_modos(n_core, n_cleavy, espesor, longitud_onda, n_substract, 'TE').max(initial=0)) #TE nunca tiene menos modos que TM
+    modos_max = max(int(modos_max), 1)
+
+    resultado = np.empty(forma, dtype=[('longitud_onda', float), ('espesor', float), ('n_core', float), ('n_cleavy', float), ('n_substract', float),
+                                       ('TE', float, (modos_max,)), ('TM', float, (modos_max,))])
+    resultado['longitud_onda'], resultado['espesor'], resultado['n_core'], resultado['n_cleavy'], resultado['n_substract'] = longitud_onda, espesor, n_core, n_cleavy, n_substract
+
+    ''' cada polarizacion se resuelve en un solo bloque para todos los puntos y todos los modos guiados '''
+    for polarizacion in ('TE', 'TM'):
+        angulos, _ = modos_guiados.resolver_modos_guiados(n_core, n_cleavy, espesor, longitud_onda, n_substract, polarizacion, modelo, modos_max)
+        resultado[polarizacion] = n_core[..., None] * np.sin(angulos) #indice efectivo de cada modo
+    return resultado
\ No newline at end of file
@@ -0,0 +1,217 @@
+import argparse
+import json
+import platform
+import time
+import numpy as np
+from scipy.optimize import brentq, minimize
+import modos_opticaRayos as ray
+import modos_opticaOndulatoria as ond
+import modos_guiados
+import barrido
+import trazador
+
+''' guias de onda de prueba: uno simetrico y uno asimetrico (sustrato distinto del recubrimiento), con espesor suficiente para varios modos '''
+casos = {
+    'simetrico': {'n_core': 1.5, 'n_cleavy': 1.45, 'n_substract': 1.45, 'espesor': 4.0, 'longitud_onda': 1.0},
+    'asimetrico': {'n_core': 1.5, 'n_cleavy': 1.0, 'n_substract': 1.45, 'espesor': 4.0, 'longitud_onda': 1.0},
+}
+
+class contar_evaluaciones:
+    ''' contexto que reemplaza temporalmente una ecuacion de un modulo por una version que cuenta cuantos puntos se evaluan, sirve tanto para las
+    llamadas escalares como para las vectorizadas (cuenta el tamano del arreglo evaluado) '''
+
+    def __init__(self, modulo, nombre):
+        self.modulo, self.nombre, self.evaluaciones = modulo, nombre, 0
+
+    def __enter__(self):
+        self.original = getattr(self.modulo, self.nombre)
+        def contada(angulo, *args):
+            valor = self.original(angulo, *args)
+            self.evaluaciones += int(np.size(valor))
+            return valor
+        setattr(self.modulo, self.nombre, contada)
+        return self
+
+    def __exit__(self, *excepcion):
+        setattr(self.modulo, self.nombre, self.original)
+
+def indice_referencia(modo, polarizacion, n_core, n_cleavy, n_substract, espesor, longitud_onda, digitos=40):
+    ''' funcion que calcula el indice efectivo de referencia de un modo resolviendo k_0*d*h - phi_c - phi_s = m*pi en alta precision con mpmath
+    (si no esta instalado se usa brentq en doble precision con tolerancia de maquina)
+
+    Retorna: indice efectivo de referencia (float) y el metodo usado (str) '''
+
+    n_alto = max(n_cleavy, n_substract)
+    try:
+        import mpmath
+    except ImportError:
+        mpmath = None
+
+    if mpmath is None:
+        def g(n):
+            h = np.sqrt(n_core**2 - n**2)
+            fases = sum(np.arctan((1 if polarizacion == 'TE' else (n_core / n_ext)**2) * np.sqrt(n**2 - n_ext**2) / h) for n_ext in (n_cleavy, n_substract))
+            return 2 * np.pi / longitud_onda * espesor * h - fases - modo * np.pi
+        return brentq(g, n_alto * (1 + 1e-15), n_core * (1 - 1e-15), xtol=1e-16, rtol=4 * np.finfo(float).eps), 'brentq'
+
+    with mpmath.workdps(digitos):
+        nc, nl, ns, d, lam = (mpmath.mpf(str(valor)) for valor in (n_core, n_cleavy, n_substract, espesor, longitud_onda))
+        def g(n):
+            h = mpmath.sqrt(nc**2 - n**2)
+            fases = sum(mpmath.atan((1 if polarizacion == 'TE' else (nc / n_ext)**2) * mpmath.sqrt(n**2 - n_ext**2) / h) for n_ext in (nl, ns))
+            return 2 * mpmath.pi / lam * d * h - fases - modo * mpmath.pi
+        raiz = mpmath.findroot(g, (max(nl, ns) * (1 + mpmath.mpf(10)**-30), nc * (1 - mpmath.mpf(10)**-30)), solver='anderson')
+        return float(raiz), 'mpmath'
+
+def variantes_escalares():
+    ''' lista de variantes escalares: (nombre, polarizacion, modulo, nombre de la ecuacion que se cuenta, funcion que resuelve el modo global m y
+    retorna el angulo) '''
+
+    def rayos(funcion):
+        return lambda m, c: funcion(c['n_core'], c['n_cleavy'], c['espesor'], m, c['n_substract'], c['longitud_onda'])[0]
+    def ondas(pares, impares):
+        return lambda m, c: (pares if m % 2 == 0 else impares)(m // 2, c['n_core'], c['n_cleavy'], c['espesor'], c['n_substract'], c['longitud_onda'])[0]
+    def minimize_original(m, c):
+        ''' ruta original con scipy minimize sobre el valor absoluto, desde el 0.01% por encima del angulo critico '''
+        critico = ray.angulo_critico(c['n_core'], c['n_cleavy'], c['n_substract'])
+        resultado = minimize(ray.modos_TERayos, 1.0001 * critico, args=(c['n_core'], c['n_cleavy'], c['espesor'], m, c['n_substract'], c['longitud_onda']), bounds=[(critico, np.pi/2)])
+        return resultado.x[0]
+
+    return [
+        ('optimizar_TERayos', 'TE', ray, 'ecuacion_TERayos', rayos(ray.optimizar_TERayos)),
+        ('optimizar_TMRayos', 'TM', ray, 'ecuacion_TMRayos', rayos(ray.optimizar_TMRayos)),
+        ('optimizar_TEOndasPares/ImPares', 'TE', ond, None, ondas(ond.optimizar_TEOndasPares, ond.optimizar_TEOndasImPares)),
+        ('optimizar_TMOndasPares/ImPares', 'TM', ond, None, ondas(ond.optimizar_TMOndasPares, ond.optimizar_TMOndasImPares)),
+        ('minimize_original_TERayos', 'TE', ray, 'ecuacion_TERayos', minimize_original),
+    ]
+
+def medir_escalares(caso, repeticiones):
+    ''' funcion que mide velocidad, evaluaciones por raiz y error de cada variante escalar en todos los modos guiados de un caso
+
+    Retorna: lista de diccionarios, uno por variante '''
+
+    resultados = []
+    for nombre, polarizacion, modulo, ecuacion, resolver in variantes_escalares():
+        numero = int(modos_guiados.numero_modos(caso['n_core'], caso['n_cleavy'], caso['espesor'], caso['longitud_onda'], caso['n_substract'], polarizacion))
+        referencia = [indice_referencia(m, polarizacion, caso['n_core'], caso['n_cleavy'], caso['n_substract'], caso['espesor'], caso['longitud_onda']) for m in range(numero)]
+
+        ''' tiempo sin los contadores instalados, para no medir su sobrecarga en cada evaluacion de la ecuacion '''
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            angulos = [resolver(m, caso) for m in range(numero)]
+        tiempo = time.perf_counter() - inicio
+
+        ''' las evaluaciones se cuentan en una pasada aparte que no se cronometra. Las ecuaciones de ondas se eligen por paridad dentro de cada
+        optimizar, se cuentan las dos '''
+        nombres_ecuacion = [ecuacion] if ecuacion else [f'ecuacion_{polarizacion}OndasPares', f'ecuacion_{polarizacion}OndasImpares']
+        contadores = [contar_evaluaciones(modulo, nombre_ecuacion) for nombre_ecuacion in nombres_ecuacion]
+        for contador in contadores:
+            contador.__enter__()
+        try:
+            for m in range(numero):
+                resolver(m, caso)
+        finally:
+            for contador in contadores:
+                contador.__exit__()
+        evaluaciones = sum(contador.evaluaciones for contador in contadores)
+
+        errores = [abs(caso['n_core'] * np.sin(angulo) - n_ref) for angulo, (n_ref, _) in zip(angulos, referencia)]
+        resultados.append({'variante': nombre, 'polarizacion': polarizacion, 'modos': numero, 'soluciones_por_segundo': repeticiones * numero / tiempo,
+                           'evaluaciones_por_raiz': evaluaciones / numero if numero else None,
+                           'error_maximo': float(max(errores)) if errores else None, 'error_por_modo': [float(error) for error in errores],
+                           'referencia': referencia[0][1] if referencia else None})
+    return resultados
+
+def medir_vectorizados(caso):
+    ''' funcion que mide la solucion en bloque de todos los modos guiados (modos_guiados) y el trazador por continuacion, con su error
+
+    Retorna: lista de diccionarios, uno por variante '''
+
+    resultados = []
+    for polarizacion in ('TE', 'TM'):
+        numero = int(modos_guiados.numero_modos(caso['n_core'], caso['n_cleavy'], caso['espesor'], caso['longitud_onda'], caso['n_substract'], polarizacion))
+        referencia = np.array([indice_referencia(m, polarizacion, caso['n_core'], caso['n_cleavy'], caso['n_substract'], caso['espesor'], caso['longitud_onda'])[0] for m in range(numero)])
+
+        inicio = time.perf_counter()
+        angulos, _ = modos_guiados.resolver_modos_guiados(caso['n_core'], caso['n_cleavy'], caso['espesor'], caso['longitud_onda'], caso['n_substract'], polarizacion)
+        tiempo = time.perf_counter() - inicio
+        modo = np.arange(numero)
+        uno = np.ones(numero)
+        _, evaluaciones = modos_guiados.refinar_modos(modo, caso['n_core'] * uno, caso['n_cleavy'] * uno, caso['espesor'] * uno, caso['n_substract'] * uno, caso['longitud_onda'] * uno, polarizacion)
+        error = np.abs(caso['n_core'] * np.sin(angulos) - referencia)
+        resultados.append({'variante': 'resolver_modos_guiados', 'polarizacion': polarizacion, 'modos': numero, 'soluciones_por_segundo': numero / tiempo,
+                           'evaluaciones_por_raiz': float(evaluaciones.mean()), 'error_maximo': float(error.max())})
+
+        ''' trazador: se llega a la longitud de onda del caso por continuacion desde 20 puntos antes '''
+        malla = np.linspace(0.95, 1.0, 21) * caso['longitud_onda']
+        inicio = time.perf_counter()
+        curva = trazador.trazar_dispersion(malla, caso['n_core'], caso['n_cleavy'], espesor=caso['espesor'], n_substract=caso['n_substract'], polarizacion=polarizacion)
+        tiempo = time.perf_counter() - inicio
+        continuados = curva['iteraciones'][1:][curva['iteraciones'][1:] > 0]
+        error = np.abs(curva['n_efectivo'][-1][:numero] - referencia)
+        resultados.append({'variante': 'trazar_dispersion', 'polarizacion': polarizacion, 'modos': numero, 'soluciones_por_segundo': float(np.isfinite(curva['n_efectivo']).sum() / tiempo),
+                           'evaluaciones_por_raiz': float(continuados.mean()), 'error_maximo': float(error.max())})
+    return resultados
+
+def escalamiento_modos(espesores):
+    ''' curva de escalamiento con el numero de modos: tiempo por raiz al aumentar el espesor de un guia simetrico, escalar contra bloque '''
+
+    curva = []
+    for espesor in espesores:
+        numero = int(modos_guiados.numero_modos(1.5, 1.45, espesor, 1.0))
+        inicio = time.perf_counter()
+        for m in range(numero):
+            ray.optimizar_TERayos(1.5, 1.45, espesor, m, 1.45, 1.0)
+        tiempo_escalar = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        modos_guiados.resolver_modos_guiados(1.5, 1.45, espesor, 1.0)
+        tiempo_bloque = time.perf_counter() - inicio
+        curva.append({'espesor': float(espesor), 'modos': numero, 'segundos_escalar': tiempo_escalar, 'segundos_bloque': tiempo_bloque})
+    return curva
+
+def escalamiento_barrido(tamanos):
+    ''' curva de escalamiento con el tamano del barrido: puntos por segundo de barrido_modos en un mapa longitud de onda x espesor '''
+
+    curva = []
+    for tamano in tamanos:
+        lado = int(np.sqrt(tamano))
+        longitudes, espesores = np.linspace(0.8, 1.6, lado), np.linspace(0.5, 3, lado)
+        inicio = time.perf_counter()
+        barrido.barrido_modos(longitudes[:, None], espesores[None, :], 1.5, 1.45)
+        tiempo = time.perf_counter() - inicio
+        curva.append({'puntos': lado * lado, 'segundos': tiempo, 'puntos_por_segundo': lado * lado / tiempo})
+    return curva
+
+def ejecutar(rapido=False):
+    ''' funcion que ejecuta todo el benchmark
+
+    Entradas:
+    rapido (bool) == si es True usa menos repeticiones y barridos mas pequenos
+
+    Retorna: diccionario con todos los resultados, listo para guardarse como JSON '''
+
+    repeticiones = 3 if rapido else 20
+    return {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'plataforma': {'python': platform.python_version(), 'numpy': np.__version__, 'maquina': platform.machine()},
+        'casos': casos,
+        'escalares': {nombre: medir_escalares(caso, repeticiones) for nombre, caso in casos.items()},
+        'vectorizados': {nombre: medir_vectorizados(caso) for nombre, caso in casos.items()},
+        'escalamiento_modos': escalamiento_modos([1, 2, 4, 8] if rapido else [1, 2, 4, 8, 16, 32]),
+        'escalamiento_barrido': escalamiento_barrido([10**2, 10**4] if rapido else [10**2, 10**3, 10**4, 10**5, 10**6]),
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='benchmark de velocidad y precision de los solucionadores de modos')
+    parser.add_argument('--salida', default='benchmark_solvers.json', help='archivo JSON donde se guardan los resultados')
+    parser.add_argument('--rapido', action='store_true', help='menos repeticiones y barridos mas pequenos')
+    argumentos = parser.parse_args()
+
+    resultados = ejecutar(argumentos.rapido)
+    with open(argumentos.salida, 'w') as archivo:
+        json.dump(resultados, archivo, indent=2)
+    for nombre, variantes in resultados['escalares'].items():
+        print(f"\n{nombre.upper()}")
+        for variante in variantes + resultados['vectorizados'][nombre]:
+            print(f"{variante['variante']:32s} {variante['polarizacion']}  {variante['soluciones_por_segundo']:12.1f} sol/s  error maximo = {variante['error_maximo']}")
+    print(f"\nresultados guardados en {argumentos.salida}")
\ No newline at end of file
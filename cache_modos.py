@@ -0,0 +1,150 @@
+import atexit
+import functools
+import hashlib
+import inspect
+import sqlite3
+from collections import OrderedDict
+import modos_opticaRayos as ray
+import modos_opticaOndulatoria as ond
+import raices
+
+''' version de las soluciones guardadas en disco: numero del esquema de la tabla mas un resumen del codigo de los solucionadores, asi que
+cualquier cambio en las ecuaciones invalida las soluciones viejas. Hay que subir version_esquema si cambia el formato de la tabla '''
+version_esquema = 1
+version_solucionador = hashlib.sha256(''.join(inspect.getsource(modulo) for modulo in (ray, ond, raices)).encode()).hexdigest()[:16]
+
+class CacheModos:
+    ''' cache de soluciones de modos: guarda en memoria (con desalojo LRU) el resultado de cada llamada a un optimizar_* y opcionalmente lo
+    persiste en una base de datos SQLite local, para que otras ejecuciones lo reutilicen
+
+    Entradas:
+    tamano_maximo (int) == numero maximo de soluciones en memoria, al superarlo se desaloja la menos usada recientemente
+    archivo (str, opcional) == ruta del archivo SQLite donde se guardan las soluciones, si es None solo se usa la memoria
+    cifras (int) == cifras significativas con las que se cuantizan los parametros para formar la clave
+    lote_escritura (int) == numero de soluciones nuevas que se acumulan antes de confirmar la escritura en disco '''
+
+    def __init__(self, tamano_maximo=100000, archivo=None, cifras=12, lote_escritura=256):
+        self.tamano_maximo = tamano_maximo
+        self.cifras = cifras
+        self.lote_escritura = lote_escritura
+        self.memoria = OrderedDict() #clave -> (angulo, valor_min), el orden es el de uso
+        self.estadisticas = {'aciertos_memoria': 0, 'aciertos_disco': 0, 'fallos': 0, 'desalojos': 0}
+        self.pendientes = 0 #escrituras en disco sin confirmar
+        self.conexion = None
+        if archivo is not None:
+            self.conexion = sqlite3.connect(archivo)
+            self.conexion.execute('CREATE TABLE IF NOT EXISTS modos (clave TEXT PRIMARY KEY, angulo REAL, valor REAL)')
+            self.conexion.execute('CREATE TABLE IF NOT EXISTS metadatos (nombre TEXT PRIMARY KEY, valor TEXT)')
+            self.verificar_version()
+            atexit.register(self.cerrar)
+
+    def verificar_version(self):
+        ''' compara la version guardada en el disco con la del codigo actual y, si no coinciden, borra las soluciones guardadas para no
+        retornar angulos calculados con otras ecuaciones
+
+        Retorna: True si el disco se vacio '''
+
+        version = f'{version_esquema}:{version_solucionador}'
+        fila = self.conexion.execute("SELECT valor FROM metadatos WHERE nombre = 'version'").fetchone()
+        if fila is not None and fila[0] == version:
+            return False
+        self.conexion.execute('DELETE FROM modos')
+        self.conexion.execute("INSERT OR REPLACE INTO metadatos VALUES ('version', ?)", (version,))
+        self.conexion.commit()
+        return fila is not None
+
+    def clave(self, nombre, args):
+        ''' clave de una llamada: nombre de la funcion (modelo, polarizacion y paridad) y sus parametros cuantizados '''
+
+        cuantizados = ['None' if arg is None else format(float(arg), f'.{self.cifras}g') for arg in args]
+        return nombre + '|' + '|'.join(cuantizados)
+
+    def obtener(self, funcion, args):
+        ''' funcion que retorna la solucion de funcion(*args), desde la memoria, el disco o calculandola en ese orden
+
+        Retorna: el mismo resultado de funcion(*args) '''
+
+        clave = self.clave(funcion.__module__ + '.' + funcion.__name__, args)
+        if clave in self.memoria:
+            self.memoria.move_to_end(clave) #pasa a ser la mas usada recientemente
+            self.estadisticas['aciertos_memoria'] += 1
+            return self.memoria[clave]
+
+        fila = None
+        if self.conexion is not None:
+            fila = self.conexion.execute('SELECT angulo, valor FROM modos WHERE clave = ?', (clave,)).fetchone()
+        if fila is not None:
+            self.estadisticas['aciertos_disco'] += 1
+            resultado = (fila[0], fila[1])
+        else:
+            self.estadisticas['fallos'] += 1
+            angulo, valor = funcion(*args)
+            resultado = (float(angulo), float(valor))
+            if self.conexion is not None:
+                self.conexion.execute('INSERT OR REPLACE INTO modos VALUES (?, ?, ?)', (clave,) + resultado)
+                self.pendientes += 1
+                if self.pendientes >= self.lote_escritura:
+                    self.guardar()
+
+        self.memoria[clave] = resultado
+        if len(self.memoria) > self.tamano_maximo:
+            self.memoria.popitem(last=False) #desalojo de la solucion menos usada recientemente
+            self.estadisticas['desalojos'] += 1
+        return resultado
+
+    def resumen(self):
+        ''' retorna las estadisticas de aciertos y fallos, con la tasa de aciertos y el numero de soluciones en memoria '''
+
+        consultas = self.estadisticas['aciertos_memoria'] + self.estadisticas['aciertos_disco'] + self.estadisticas['fallos']
+        tasa = (consultas - self.estadisticas['fallos']) / consultas if consultas else 0.0
+        return dict(self.estadisticas, consultas=consultas, tasa_aciertos=tasa, en_memoria=len(self.memoria))
+
+    def limpiar(self):
+        ''' vacia la memoria y reinicia las estadisticas (el disco no se modifica) '''
+
+        self.memoria.clear()
+        for nombre in self.estadisticas:
+            self.estadisticas[nombre] = 0
+
+    def guardar(self):
+        ''' confirma en disco las soluciones pendientes '''
+
+        if self.conexion is not None and self.pendientes:
+            self.conexion.commit()
+            self.pendientes = 0
+
+    def cerrar(self):
+        ''' guarda las soluciones pendientes y cierra la base de datos '''
+
+        if self.conexion is not None:
+            self.guardar()
+            self.conexion.close()
+            self.conexion = None
+
+def memorizar(funcion, cache):
+    ''' funcion que envuelve un optimizar_* para que sus resultados pasen por la cache
+
+    Entradas:
+    funcion (callable) == funcion optimizar_* de modos_opticaRayos o modos_opticaOndulatoria
+    cache (CacheModos) == cache donde se guardan las soluciones
+
+    Retorna: funcion con la misma firma que la original '''
+
+    firma = inspect.signature(funcion)
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        argumentos = firma.bind(*args, **kwargs)
+        argumentos.apply_defaults() #se completan los argumentos por defecto para que llamadas equivalentes tengan la misma clave
+        return cache.obtener(funcion, argumentos.args)
+    return envoltura
+
+''' cache por defecto (solo en memoria) y versiones memorizadas de todos los optimizar_*, con la misma firma que las originales. Para usar disco
+se puede crear otra cache, por ejemplo memorizar(ray.optimizar_TERayos, CacheModos(archivo='modos.sqlite')) '''
+cache_global = CacheModos()
+optimizar_TERayos = memorizar(ray.optimizar_TERayos, cache_global)
+optimizar_TMRayos = memorizar(ray.optimizar_TMRayos, cache_global)
+optimizar_TEOndasPares = memorizar(ond.optimizar_TEOndasPares, cache_global)
+optimizar_TEOndasImPares = memorizar(ond.optimizar_TEOndasImPares, cache_global)
+optimizar_TMOndasPares = memorizar(ond.optimizar_TMOndasPares, cache_global)
+optimizar_TMOndasImPares = memorizar(ond.optimizar_TMOndasImPares, cache_global)
\ No newline at end of file
@@ -0,0 +1,104 @@
+from contextlib import contextmanager
+import numpy as np
+import raices
+
+def agregar_observador(observador):
+    ''' funcion que registra un observador: observador(registro) se llama despues de cada solucion con un diccionario con las llaves 'origen',
+    'tiempo' (segundos de toda la llamada), 'raices', 'evaluaciones', 'iteraciones', 'residuo' y 'convergido' (un valor por raiz), 'parametros'
+    (argumentos de la ecuacion de cada raiz, en el orden de la ecuacion), 'sin_intervalo' (numero de problemas en los que la busqueda no encontro
+    ningun cambio de signo) y 'parametros_sin_intervalo' (argumentos de la ecuacion de esos problemas) '''
+
+    raices.observadores.append(observador)
+
+def quitar_observador(observador):
+    ''' funcion que quita un observador registrado con agregar_observador '''
+
+    raices.observadores.remove(observador)
+
+@contextmanager
+def instrumentar():
+    ''' contexto que guarda los registros de todas las soluciones que ocurren dentro de el, por ejemplo:
+
+        with instrumentar() as registros:
+            ray.optimizar_TERayos(1.5, 1, 1, 0, 1, 1)
+        print(tabla_resumen(registros))
+
+    Retorna: lista de registros (se va llenando mientras el contexto esta activo) '''
+
+    registros = []
+    agregar_observador(registros.append)
+    try:
+        yield registros
+    finally:
+        quitar_observador(registros.append)
+
+def concatenar(registros, campo):
+    ''' funcion que junta un campo por raiz ('evaluaciones', 'iteraciones', 'residuo' o 'convergido') de todos los registros en un solo arreglo '''
+
+    valores = [np.ravel(registro[campo]) for registro in registros]
+    return np.concatenate(valores) if valores else np.zeros(0)
+
+def tabla_resumen(registros):
+    ''' funcion que agrupa los registros por origen y calcula llamadas, raices, tiempo total y por raiz, evaluaciones promedio y maximas, raices
+    sin converger, problemas sin intervalo (sin cambio de signo, el optimizar_* retorna el angulo critico) y residuo maximo
+
+    Retorna: structured array con una fila por origen '''
+
+    origenes = sorted({registro['origen'] for registro in registros})
+    tabla = np.zeros(len(origenes), dtype=[('origen', 'U64'), ('llamadas', int), ('raices', int), ('tiempo_total', float), ('tiempo_por_raiz', float),
+                                           ('evaluaciones_promedio', float), ('evaluaciones_max', int), ('sin_converger', int), ('sin_intervalo', int),
+                                           ('residuo_max', float)])
+    for fila, origen in zip(tabla, origenes):
+        grupo = [registro for registro in registros if registro['origen'] == origen]
+        evaluaciones = concatenar(grupo, 'evaluaciones')
+        numero = sum(registro['raices'] for registro in grupo)
+        tiempo = sum(registro['tiempo'] for registro in grupo)
+        fila['origen'], fila['llamadas'], fila['raices'], fila['tiempo_total'] = origen, len(grupo), numero, tiempo
+        fila['tiempo_por_raiz'] = tiempo / numero if numero else np.nan
+        fila['evaluaciones_promedio'] = evaluaciones.mean() if evaluaciones.size else np.nan
+        fila['evaluaciones_max'] = evaluaciones.max(initial=0)
+        fila['sin_converger'] = int((~concatenar(grupo, 'convergido').astype(bool)).sum())
+        fila['sin_intervalo'] = sum(registro.get('sin_intervalo', 0) for registro in grupo)
+        fila['residuo_max'] = np.nanmax(concatenar(grupo, 'residuo'), initial=0)
+    return tabla
+
+def histograma(registros, campo='evaluaciones', bins=10):
+    ''' funcion que calcula el histograma de un campo por raiz ('evaluaciones', 'iteraciones' o 'residuo'), o del tiempo por raiz con campo='tiempo'
+
+    Retorna: conteos y bordes de los intervalos, como np.histogram '''
+
+    if campo == 'tiempo':
+        valores = np.concatenate([np.full(registro['raices'], registro['tiempo'] / max(registro['raices'], 1)) for registro in registros]) if registros else np.zeros(0)
+    else:
+        valores = concatenar(registros, campo)
+    return np.histogram(valores, bins=bins)
+
+def casos_problematicos(registros, evaluaciones_minimas=None, incluir_sin_intervalo=True):
+    ''' funcion que extrae las raices que no convergieron (o que necesitaron al menos evaluaciones_minimas evaluaciones) y, si incluir_sin_intervalo
+    es True, los problemas en los que no se encontro ningun cambio de signo, junto con sus parametros, para encontrar las regiones del espacio de
+    parametros que hacen lento o fallar al solucionador
+
+    Retorna: lista de diccionarios con 'origen', 'evaluaciones', 'residuo', 'convergido', 'sin_intervalo' y 'parametros' (tupla de valores en el
+    orden de la ecuacion). En los problemas sin intervalo no hay raiz: 'evaluaciones' es 0, 'residuo' es nan y 'convergido' es False '''
+
+    casos = []
+    for registro in registros:
+        if incluir_sin_intervalo:
+            for i in range(registro.get('sin_intervalo', 0)):
+                casos.append({'origen': registro['origen'], 'evaluaciones': 0, 'residuo': np.nan, 'convergido': False, 'sin_intervalo': True,
+                              'parametros': tuple(np.asarray(parametro)[i] for parametro in registro['parametros_sin_intervalo'])})
+        marcados = ~np.asarray(registro['convergido'], dtype=bool)
+        if evaluaciones_minimas is not None:
+            marcados |= np.asarray(registro['evaluaciones']) >= evaluaciones_minimas
+        for i in np.nonzero(marcados)[0]:
+            casos.append({'origen': registro['origen'], 'evaluaciones': int(registro['evaluaciones'][i]), 'residuo': float(registro['residuo'][i]),
+                          'convergido': bool(registro['convergido'][i]), 'sin_intervalo': False, 'parametros': tuple(np.asarray(parametro)[i] if np.ndim(parametro) else parametro for parametro in registro['parametros'])})
+    return casos
+
+def imprimir_resumen(registros):
+    ''' funcion que imprime por consola la tabla de resumen de los registros '''
+
+    print(f"{'origen':40s} {'llamadas':>9s} {'raices':>8s} {'t/raiz (us)':>12s} {'eval prom':>10s} {'eval max':>9s} {'sin conv':>9s} {'sin interv':>10s} {'residuo max':>12s}")
+    for fila in tabla_resumen(registros):
+        print(f"{fila['origen']:40s} {fila['llamadas']:9d} {fila['raices']:8d} {fila['tiempo_por_raiz'] * 1e6:12.2f} {fila['evaluaciones_promedio']:10.2f} "
+              f"{fila['evaluaciones_max']:9d} {fila['sin_converger']:9d} {fila['sin_intervalo']:10d} {fila['residuo_max']:12.3e}")
\ No newline at end of file
@@ -0,0 +1,196 @@
+''' punto de entrada por linea de comandos para resolver modos guiados por lotes. Lee conjuntos de parametros linea a linea (CSV con encabezado o
+JSONL) desde un archivo o desde la entrada estandar y escribe los resultados a medida que se resuelven, asi que el archivo nunca se carga completo
+en memoria. Ejemplos:
+
+    python linea_comandos.py parametros.csv --modelo ondas --salida modos.csv
+    cat parametros.jsonl | python linea_comandos.py --polarizacion TE -j 0 > modos.jsonl
+
+Columnas de entrada: n_core, n_cleavy, espesor y opcionalmente n_substract (por defecto n_cleavy) y longitud_onda (por defecto una micra).
+Se escribe un registro por modo guiado con fila (numero de fila de la entrada, desde 0), los parametros, polarizacion, modo, angulo y n_efectivo;
+las filas que no guian ningun modo no producen registros.
+
+numpy y los modulos de modos se importan solo en la funcion que resuelve cada bloque, para que el arranque (y --help) sea rapido '''
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+columnas = ('n_core', 'n_cleavy', 'espesor', 'n_substract', 'longitud_onda') #parametros de entrada
+obligatorias = ('n_core', 'n_cleavy', 'espesor')
+salida_columnas = ('fila', 'longitud_onda', 'espesor', 'n_core', 'n_cleavy', 'n_substract', 'polarizacion', 'modo', 'angulo', 'n_efectivo')
+
+def leer_filas(lineas, formato='csv'):
+    ''' generador que convierte las lineas de la entrada en parametros a medida que se leen
+
+    Entradas:
+    lineas (iterable) == lineas de texto, por ejemplo un archivo abierto o sys.stdin
+    formato (str) == 'csv' (con encabezado) o 'jsonl'
+
+    Retorna: tuplas (n_core, n_cleavy, espesor, n_substract, longitud_onda) de floats, una por fila '''
+
+    if formato == 'jsonl':
+        for numero, linea in enumerate(lineas, start=1):
+            if linea.strip():
+                yield _convertir_fila(json.loads(linea), numero)
+    elif formato == 'csv':
+        lector = csv.DictReader(lineas)
+        faltantes = [nombre for nombre in obligatorias if nombre not in (lector.fieldnames or obligatorias)]
+        if faltantes:
+            raise ValueError(f"faltan columnas en el encabezado: {', '.join(faltantes)}")
+        for fila in lector:
+            yield _convertir_fila(fila, lector.line_num)
+    else:
+        raise ValueError(f"formato desconocido: {formato}, debe ser 'csv' o 'jsonl'")
+
+def _encadenar(primeras, entrada):
+    ''' generador que entrega las lineas ya leidas y despues el resto de la entrada '''
+
+    yield from primeras
+    yield from entrada
+
+def _convertir_fila(fila, numero):
+    ''' lleva una fila (diccionario) a la tupla de parametros, con n_substract = n_cleavy y longitud_onda = 1 por defecto '''
+
+    try:
+        n_core, n_cleavy, espesor = (float(fila[nombre]) for nombre in obligatorias)
+        n_substract = float(fila['n_substract']) if fila.get('n_substract') not in (None, '') else n_cleavy
+        longitud_onda = float(fila['longitud_onda']) if fila.get('longitud_onda') not in (None, '') else 1.0
+    except (KeyError, TypeError, ValueError) as error:
+        raise ValueError(f"linea {numero}: fila de parametros invalida ({error!r})") from error
+    return (n_core, n_cleavy, espesor, n_substract, longitud_onda)
+
+def agrupar(filas, tamano_bloque):
+    ''' generador que agrupa las filas en bloques de a lo sumo tamano_bloque filas '''
+
+    bloque = []
+    for fila in filas:
+        bloque.append(fila)
+        if len(bloque) == tamano_bloque:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+def resolver_bloque(bloque, primera_fila, modelo='rayos', polarizaciones=('TE', 'TM'), modos_max=None, formato='csv'):
+    ''' funcion que resuelve todos los modos guiados de un bloque de filas y los formatea como texto (se ejecuta en los procesos del pool)
+
+    Entradas:
+    bloque (list) == tuplas de parametros de leer_filas
+    primera_fila (int) == numero de la primera fila del bloque dentro de la entrada
+    modelo (str) == 'rayos' u 'ondas'
+    polarizaciones (tuple) == polarizaciones que se resuelven, 'TE' y/o 'TM'
+    modos_max (int, opcional) == numero maximo de modos por polarizacion, por defecto todos los guiados
+    formato (str) == formato de salida, 'csv' o 'jsonl'
+
+    Retorna: texto con un registro por linea, en el orden de las filas, polarizaciones y modos '''
+
+    import numpy as np
+    import modos_guiados
+
+    n_core, n_cleavy, espesor, n_substract, longitud_onda = np.array(bloque, dtype=float).reshape(-1, len(columnas)).T
+    angulos = {polarizacion: modos_guiados.resolver_modos_guiados(n_core, n_cleavy, espesor, longitud_onda, n_substract, polarizacion, modelo, modos_max)[0]
+               for polarizacion in polarizaciones}
+
+    lineas = []
+    for i, parametros in enumerate(bloque):
+        for polarizacion in polarizaciones:
+            for modo in np.nonzero(~np.isnan(angulos[polarizacion][i]))[0]:
+                angulo = float(angulos[polarizacion][i, modo])
+                registro = (primera_fila + i, parametros[4], parametros[2], parametros[0], parametros[1], parametros[3], polarizacion, int(modo),
+                            angulo, parametros[0] * float(np.sin(angulo)))
+                if formato == 'jsonl':
+                    lineas.append(json.dumps(dict(zip(salida_columnas, registro))))
+                else:
+                    lineas.append(','.join(map(str, registro)))
+    return ''.join(linea + '\n' for linea in lineas)
+
+def ejecutar(entrada, salida, formato=None, formato_salida=None, modelo='rayos', polarizaciones=('TE', 'TM'), modos_max=None, trabajadores=1,
+             tamano_bloque=1024):
+    ''' funcion que lee la entrada por bloques, los resuelve (en un ProcessPoolExecutor si hay mas de un trabajador) y escribe cada bloque en la
+    salida en el orden de la entrada apenas esta listo. Solo se mantienen en vuelo unos pocos bloques por proceso
+
+    Entradas:
+    entrada, salida (archivos de texto) == archivos abiertos o sys.stdin / sys.stdout
+    formato, formato_salida (str, opcional) == 'csv' o 'jsonl'; la entrada se detecta si es None y la salida usa por defecto el de la entrada
+    modelo, polarizaciones, modos_max == ver resolver_bloque
+    trabajadores (int) == numero de procesos, 0 usa todos los nucleos y 1 resuelve en el proceso actual
+    tamano_bloque (int) == numero de filas por bloque
+
+    Retorna: numero de filas leidas '''
+
+    primera = entrada.readline() #se lee aparte para detectar el formato sin perderla, tambien con sys.stdin
+    if formato is None:
+        formato = 'jsonl' if primera.lstrip().startswith('{') else 'csv'
+    formato_salida = formato_salida or formato
+    filas = leer_filas(_encadenar((primera,), entrada), formato)
+    trabajadores = (os.cpu_count() or 1) if trabajadores == 0 else trabajadores
+    if formato_salida == 'csv':
+        salida.write(','.join(salida_columnas) + '\n')
+
+    import lotes #trae numpy, se importa aqui para que el arranque siga siendo rapido
+    leidas = 0
+    opciones = (modelo, tuple(polarizaciones), modos_max, formato_salida)
+
+    def tareas():
+        ''' argumentos de resolver_bloque de cada bloque, con el numero de su primera fila '''
+        nonlocal leidas
+        for bloque in agrupar(filas, tamano_bloque):
+            yield (bloque, leidas) + opciones
+            leidas += len(bloque)
+
+    for texto in lotes.mapear_en_orden(resolver_bloque, tareas(), trabajadores):
+        salida.write(texto)
+    return leidas
+
+def crear_parser():
+    ''' argumentos de la linea de comandos '''
+
+    parser = argparse.ArgumentParser(description='Resuelve los modos guiados TE/TM de guias de onda planos leidos linea a linea (CSV o JSONL).')
+    parser.add_argument('entrada', nargs='?', default='-', help="archivo de parametros, '-' o nada para leer la entrada estandar")
+    parser.add_argument('-o', '--salida', default='-', help="archivo de resultados, '-' o nada para la salida estandar")
+    parser.add_argument('-f', '--formato', choices=('csv', 'jsonl'), help='formato de la entrada, por defecto se detecta con la primera linea')
+    parser.add_argument('--formato-salida', choices=('csv', 'jsonl'), help='formato de la salida, por defecto el de la entrada')
+    parser.add_argument('-m', '--modelo', choices=('rayos', 'ondas'), default='rayos', help='optica de rayos u optica ondulatoria')
+    parser.add_argument('-p', '--polarizacion', choices=('TE', 'TM', 'ambas'), default='ambas', help='polarizaciones que se resuelven')
+    parser.add_argument('--modos-max', type=int, help='numero maximo de modos por polarizacion, por defecto todos los guiados')
+    parser.add_argument('-j', '--trabajadores', type=int, default=1, help='numero de procesos, 0 usa todos los nucleos (por defecto 1)')
+    parser.add_argument('--tamano-bloque', type=int, default=1024, help='filas que se resuelven juntas en cada bloque')
+    return parser
+
+def main(argumentos=None):
+    ''' funcion principal, retorna el codigo de salida del programa '''
+
+    opciones = crear_parser().parse_args(argumentos)
+    polarizaciones = ('TE', 'TM') if opciones.polarizacion == 'ambas' else (opciones.polarizacion,)
+    entrada, salida = sys.stdin, sys.stdout
+    try:
+        ruta = opciones.entrada
+        if ruta != '-':
+            entrada = open(ruta, newline='')
+        ruta = opciones.salida
+        if ruta != '-':
+            salida = open(ruta, 'w', newline='')
+        ejecutar(entrada, salida, opciones.formato, opciones.formato_salida, opciones.modelo, polarizaciones, opciones.modos_max,
+                 opciones.trabajadores, opciones.tamano_bloque)
+    except ValueError as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        ''' la salida se cerro antes de tiempo (por ejemplo con | head), se termina sin error '''
+        sys.stderr.close()
+        return 0
+    except OSError as error:
+        ''' archivo que no existe o no se puede leer o escribir '''
+        print(f"error: {error.filename or ruta}: {error.strerror or error}", file=sys.stderr)
+        return 1
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+        if salida is not sys.stdout:
+            salida.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
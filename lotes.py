@@ -0,0 +1,161 @@
+import csv
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import modos_opticaRayos as ray
+import modos_opticaOndulatoria as ond
+
+''' funciones que se pueden ejecutar por lotes, cada una se resuelve con su version vectorizada sobre todo el bloque '''
+funciones = {
+    'optimizar_TERayos': ray.optimizar_TERayosVectorizado,
+    'optimizar_TMRayos': ray.optimizar_TMRayosVectorizado,
+    'optimizar_TEOndasPares': ond.optimizar_TEOndasParesVectorizado,
+    'optimizar_TEOndasImPares': ond.optimizar_TEOndasImParesVectorizado,
+    'optimizar_TMOndasPares': ond.optimizar_TMOndasParesVectorizado,
+    'optimizar_TMOndasImPares': ond.optimizar_TMOndasImParesVectorizado,
+}
+columnas = ('n_core', 'n_cleavy', 'espesor', 'modo', 'n_substract', 'longitud_onda') #columnas de la tabla de parametros
+
+def _completar_bloque(bloque):
+    ''' funcion auxiliar que lleva un bloque (structured array o diccionario de columnas) a un diccionario de arreglos con todas las columnas,
+    n_substract por defecto es n_cleavy y longitud_onda por defecto es una micra '''
+
+    nombres = bloque.dtype.names if isinstance(bloque, np.ndarray) else tuple(bloque)
+    faltantes = [nombre for nombre in ('n_core', 'n_cleavy', 'espesor', 'modo') if nombre not in nombres]
+    if faltantes:
+        raise ValueError(f"faltan columnas en la tabla de parametros: {', '.join(faltantes)}")
+    completo = {nombre: np.asarray(bloque[nombre], dtype=float) for nombre in columnas if nombre in nombres}
+    completo['modo'] = completo['modo'].astype(int)
+    completo.setdefault('n_substract', completo['n_cleavy'])
+    completo.setdefault('longitud_onda', np.ones_like(completo['n_core']))
+    return completo
+
+def resolver_bloque(nombre_funcion, bloque):
+    ''' funcion que resuelve todas las filas de un bloque de parametros (se ejecuta en los procesos del pool)
+
+    Entradas:
+    nombre_funcion (str) == nombre de la funcion, una de las llaves de funciones (por ejemplo 'optimizar_TERayos')
+    bloque (structured array o dict) == columnas n_core, n_cleavy, espesor, modo y opcionalmente n_substract y longitud_onda
+
+    Retorna: structured array con las columnas de entrada mas 'angulo', 'n_efectivo' y 'residuo' (nan si el modo no es guiado) '''
+
+    parametros = _completar_bloque(bloque)
+
+    ''' la ecuacion de un modo fijo es monotona en el angulo, asi que los extremos del intervalo bastan para acotar su raiz (n_muestras=2) '''
+    angulos, residuo = funciones[nombre_funcion](n_core=parametros['n_core'], n_cleavy=parametros['n_cleavy'], espesor=parametros['espesor'], modos=parametros['modo'],
+                                                 n_substract=parametros['n_substract'], longitud_onda=parametros['longitud_onda'], n_muestras=2)
+    resultado = np.empty(angulos.shape, dtype=[(nombre, int if nombre == 'modo' else float) for nombre in columnas] + [('angulo', float), ('n_efectivo', float), ('residuo', float)])
+    for nombre in columnas:
+        resultado[nombre] = parametros[nombre]
+    resultado['angulo'], resultado['n_efectivo'], resultado['residuo'] = angulos, parametros['n_core'] * np.sin(angulos), residuo
+    return resultado
+
+def leer_bloques(fuente, tamano_bloque=4096):
+    ''' generador que lee una tabla de parametros por bloques, sin cargarla completa en memoria
+
+    Entradas:
+    fuente (str, array o dict) == archivo .csv (con encabezado), .npy (structured array, se abre con memmap) o .parquet (requiere pyarrow),
+    o una tabla ya cargada (structured array o diccionario de columnas)
+    tamano_bloque (int) == numero de filas por bloque
+
+    Retorna: bloques sucesivos de la tabla (structured array o diccionario de columnas) '''
+
+    if not isinstance(fuente, (str, os.PathLike)):
+        total = len(fuente) if isinstance(fuente, np.ndarray) else len(next(iter(fuente.values())))
+        for inicio in range(0, total, tamano_bloque):
+            yield fuente[inicio:inicio + tamano_bloque] if isinstance(fuente, np.ndarray) else {nombre: np.asarray(valores)[inicio:inicio + tamano_bloque] for nombre, valores in fuente.items()}
+        return
+
+    extension = os.path.splitext(str(fuente))[1].lower()
+    if extension == '.npy':
+        tabla = np.load(fuente, mmap_mode='r')
+        for inicio in range(0, len(tabla), tamano_bloque):
+            yield np.array(tabla[inicio:inicio + tamano_bloque])
+    elif extension == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise ImportError('para leer archivos parquet hace falta instalar pyarrow') from error
+        for lote in pq.ParquetFile(fuente).iter_batches(batch_size=tamano_bloque):
+            yield {nombre: lote.column(nombre).to_numpy() for nombre in lote.schema.names}
+    elif extension == '.csv':
+        with open(fuente, newline='') as archivo:
+            lector = csv.DictReader(archivo)
+            filas = []
+            for fila in lector:
+                filas.append(fila)
+                if len(filas) == tamano_bloque:
+                    yield {nombre: np.array([f[nombre] for f in filas], dtype=float) for nombre in lector.fieldnames}
+                    filas = []
+            if filas:
+                yield {nombre: np.array([f[nombre] for f in filas], dtype=float) for nombre in lector.fieldnames}
+    else:
+        raise ValueError(f"formato de tabla desconocido: {extension}, debe ser .csv, .npy o .parquet")
+
+def reportar_progreso(filas, bloques):
+    ''' funcion de progreso por defecto, escribe en stderr las filas y bloques resueltos '''
+
+    print(f"\rbloques resueltos: {bloques}, filas resueltas: {filas}", end='', file=sys.stderr, flush=True)
+
+def mapear_en_orden(funcion, argumentos, trabajadores=1, por_trabajador=2):
+    ''' generador que aplica funcion(*args) a cada tupla de argumentos repartiendolas en un ProcessPoolExecutor y entrega los resultados en el
+    orden de los argumentos. Solo se mantienen en vuelo por_trabajador tareas por proceso: se espera a la mas antigua antes de pedir mas
+    argumentos, asi que el iterable se consume a medida que avanza el pool y nunca se carga completo
+
+    Entradas:
+    funcion (callable) == funcion a nivel de modulo (se envia a los procesos con pickle)
+    argumentos (iterable) == tuplas de argumentos, una por tarea
+    trabajadores (int) == numero de procesos, con 1 (o menos) se resuelve en el proceso actual
+    por_trabajador (int) == tareas en vuelo por proceso
+
+    Retorna: resultados de funcion en el orden de los argumentos '''
+
+    if trabajadores <= 1:
+        for args in argumentos:
+            yield funcion(*args)
+        return
+
+    with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+        en_vuelo = deque() #futuros en el orden de los argumentos
+        for args in argumentos:
+            en_vuelo.append(pool.submit(funcion, *args))
+            if len(en_vuelo) >= por_trabajador * trabajadores: #se espera a la tarea mas antigua antes de leer mas
+                yield en_vuelo.popleft().result()
+        while en_vuelo:
+            yield en_vuelo.popleft().result()
+
+def ejecutar_lotes(fuente, nombre_funcion='optimizar_TERayos', trabajadores=None, tamano_bloque=4096, progreso=reportar_progreso):
+    ''' generador que resuelve una tabla de parametros repartiendo sus bloques en un ProcessPoolExecutor y entrega los resultados en el mismo orden
+    de la tabla a medida que terminan. Solo se mantienen en vuelo unos pocos bloques por proceso, asi que tablas muy grandes no se cargan enteras
+
+    Entradas:
+    fuente (str, array o dict) == tabla de parametros, ver leer_bloques
+    nombre_funcion (str) == funcion con la que se resuelve cada fila, ver funciones
+    trabajadores (int, opcional) == numero de procesos, por defecto todos los nucleos; con 1 se resuelve en el proceso actual
+    tamano_bloque (int) == numero de filas por bloque
+    progreso (callable, opcional) == funcion progreso(filas, bloques) que se llama cada vez que se entrega un bloque, None para no reportar
+
+    Retorna: bloques de resultados en orden (structured arrays de resolver_bloque) '''
+
+    if nombre_funcion not in funciones:
+        raise ValueError(f"funcion desconocida: {nombre_funcion}, debe ser una de {', '.join(funciones)}")
+    trabajadores = (os.cpu_count() or 1) if trabajadores is None else int(trabajadores)
+    bloques = leer_bloques(fuente, tamano_bloque)
+    filas, hechos = 0, 0
+    for resultado in mapear_en_orden(resolver_bloque, ((nombre_funcion, bloque) for bloque in bloques), trabajadores):
+        filas, hechos = filas + len(resultado), hechos + 1
+        if progreso is not None:
+            progreso(filas, hechos)
+        yield resultado
+
+def resolver_tabla(fuente, nombre_funcion='optimizar_TERayos', trabajadores=None, tamano_bloque=4096, progreso=None):
+    ''' funcion que resuelve una tabla de parametros completa con ejecutar_lotes y junta todos los bloques en un solo arreglo
+
+    Entradas: las mismas de ejecutar_lotes
+
+    Retorna: structured array con una fila de resultados por fila de la tabla '''
+
+    bloques = list(ejecutar_lotes(fuente, nombre_funcion, trabajadores, tamano_bloque, progreso))
+    return np.concatenate(bloques) if bloques else resolver_bloque(nombre_funcion, {nombre: np.zeros(0) for nombre in ('n_core', 'n_cleavy', 'espesor', 'modo')})
\ No newline at end of file
@@ -0,0 +1,134 @@
+import numpy as np
+import raices
+
+def matrices_capas(n_efectivo, longitud_onda, indices, espesores, polarizacion='TE'):
+    ''' funcion que calcula la matriz de transferencia 2x2 de cada capa para muchos indices efectivos y longitudes de onda a la vez. La matriz
+    relaciona (campo, derivada) a un lado y otro de la capa, con campo = E_y y derivada = dE_y/dx en TE, o campo = H_y y derivada = (1/n^2) dH_y/dx
+    en TM. Se usa una forma real que vale tanto si la onda es oscilante (n_efectivo < n_capa) como evanescente (n_efectivo > n_capa)
+
+    Entradas:
+    n_efectivo (float o array) == indice efectivo en el que se evaluan las matrices
+    longitud_onda (float o array) == longitud de onda en micras, hace broadcasting con n_efectivo
+    indices (array 1D) == indice de refraccion de cada capa interna, del lado del sustrato al lado del recubrimiento
+    espesores (array 1D) == espesor de cada capa en micras
+    polarizacion (str) == 'TE' o 'TM'
+
+    Retorna: matrices de forma (forma del broadcasting, numero de capas, 2, 2) '''
+
+    indices, espesores = np.asarray(indices, dtype=float), np.asarray(espesores, dtype=float)
+    numero_onda = 2 * np.pi / np.asarray(longitud_onda, dtype=float)[..., None] #numero de onda en el vacio k_0
+    s = numero_onda**2 * (indices**2 - np.asarray(n_efectivo, dtype=float)[..., None]**2) #kappa^2 de cada capa (negativo si es evanescente)
+    r = np.sqrt(np.abs(s)) * espesores #fase (o atenuacion) acumulada en la capa
+
+    ''' cos(kappa*d) y sin(kappa*d)/kappa, o cosh y sinh/q en las capas evanescentes (el limite kappa -> 0 da 1 y d) '''
+    oscilante = s > 0
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        coseno = np.where(oscilante, np.cos(r), np.cosh(r))
+        seno = espesores * np.where(oscilante, np.sinc(r / np.pi), np.where(r > 0, np.sinh(r) / r, 1.0))
+    factor = 1.0 if polarizacion == 'TE' else indices**2 #en TM la derivada que se conserva es (1/n^2) dH/dx
+
+    matrices = np.empty(s.shape + (2, 2))
+    matrices[..., 0, 0] = coseno
+    matrices[..., 0, 1] = seno * factor
+    matrices[..., 1, 0] = -s * seno / factor
+    matrices[..., 1, 1] = coseno
+    return matrices
+
+def producto_matrices(matrices):
+    ''' funcion que multiplica una pila de matrices a lo largo del eje de las capas, M_total = M_N @ ... @ M_2 @ M_1, por reduccion en arbol:
+    en cada paso se multiplican todas las parejas vecinas a la vez, asi que solo hay log2(N) pasos y ningun ciclo por capa
+
+    Entradas:
+    matrices (array) == matrices de forma (..., numero de capas, 2, 2), la primera capa es la que recorre primero el campo
+
+    Retorna: producto de forma (..., 2, 2) '''
+
+    while matrices.shape[-3] > 1:
+        pares = matrices.shape[-3] // 2
+        producto = matrices[..., 1:2 * pares:2, :, :] @ matrices[..., 0:2 * pares:2, :, :] #capa 2i+1 despues de la capa 2i
+        if matrices.shape[-3] % 2:
+            producto = np.concatenate([producto, matrices[..., -1:, :, :]], axis=-3) #la capa sobrante pasa al siguiente paso
+        matrices = producto
+    return matrices[..., 0, :, :]
+
+def funcion_dispersion(n_efectivo, longitud_onda, indices, espesores, n_cleavy, n_substract, polarizacion='TE'):
+    ''' funcion de dispersion del guia multicapa: se parte de un campo que decae en el sustrato, se propaga por todas las capas y se mide cuanto
+    falla la condicion de decaimiento en el recubrimiento. Es cero exactamente en los indices efectivos de los modos guiados
+
+    Entradas:
+    n_efectivo, longitud_onda (float o array) == puntos en los que se evalua, hacen broadcasting entre si
+    indices, espesores (array 1D) == tabla de capas internas, del sustrato al recubrimiento
+    n_cleavy, n_substract (float) == indices de los medios semi-infinitos del recubrimiento y del sustrato
+    polarizacion (str) == 'TE' o 'TM'
+
+    Retorna: valor de la funcion de dispersion (array con la forma del broadcasting) '''
+
+    numero_onda = 2 * np.pi / np.asarray(longitud_onda, dtype=float)
+    n_efectivo = np.asarray(n_efectivo, dtype=float)
+    gamma_s = numero_onda * np.sqrt(np.maximum(n_efectivo**2 - n_substract**2, 0)) #decaimiento en el sustrato
+    gamma_c = numero_onda * np.sqrt(np.maximum(n_efectivo**2 - n_cleavy**2, 0)) #decaimiento en el recubrimiento
+    if polarizacion == 'TM':
+        gamma_s, gamma_c = gamma_s / n_substract**2, gamma_c / n_cleavy**2
+
+    M = producto_matrices(matrices_capas(n_efectivo, longitud_onda, indices, espesores, polarizacion))
+    campo = M[..., 0, 0] + M[..., 0, 1] * gamma_s #campo y derivada en la interfaz con el recubrimiento
+    derivada = M[..., 1, 0] + M[..., 1, 1] * gamma_s
+    return derivada + gamma_c * campo
+
+def resolver_multicapa(indices, espesores, n_cleavy, n_substract, longitud_onda, polarizacion='TE', n_muestras=400, tamano_bloque=2097152):
+    ''' funcion que encuentra los indices efectivos de los modos guiados de un guia multicapa (o de un perfil gradual discretizado) para muchas
+    longitudes de onda a la vez: se buscan los cambios de signo de la funcion de dispersion entre el mayor indice externo y el mayor indice interno
+    y se refinan todas las raices juntas con el metodo de Illinois. Las longitudes de onda se procesan por bloques para que la malla de busqueda
+    (muestras x longitudes de onda x capas) no pase de tamano_bloque elementos, asi la memoria no crece con el numero de longitudes de onda
+
+    Entradas:
+    indices, espesores (array 1D) == tabla de capas internas, del sustrato al recubrimiento
+    n_cleavy, n_substract (float) == indices del recubrimiento y del sustrato
+    longitud_onda (float o array 1D) == longitudes de onda en micras
+    polarizacion (str) == 'TE' o 'TM'
+    n_muestras (int) == puntos de la malla de indice efectivo con la que se buscan los cambios de signo, debe ser mayor que el numero de modos
+    tamano_bloque (int) == numero maximo de elementos de la malla de busqueda de cada bloque (cada uno lleva una matriz 2x2 y sus temporales)
+
+    Retorna: indices efectivos de forma (numero de longitudes de onda, maximo numero de modos), ordenados del modo 0 en adelante, nan donde no
+    hay modo (con longitud_onda escalar la forma es (maximo numero de modos,)) '''
+
+    if polarizacion not in ('TE', 'TM'):
+        raise ValueError(f"polarizacion desconocida: {polarizacion}, debe ser 'TE' o 'TM'")
+    longitudes = np.atleast_1d(np.asarray(longitud_onda, dtype=float))
+    n_externo, n_maximo = max(n_cleavy, n_substract), np.max(indices)
+
+    ''' se excluyen los extremos exactos, en los que la funcion de dispersion tiene un modo en el corte o es degenerada '''
+    margen = 1e-12 * (n_maximo - n_externo)
+    def dispersion(n_efectivo, longitud):
+        return funcion_dispersion(n_efectivo, longitud, indices, espesores, n_cleavy, n_substract, polarizacion)
+    paso = max(int(tamano_bloque) // (max(int(n_muestras), 2) * np.size(indices)), 1) #longitudes de onda por bloque
+    raiz, columna = [], []
+    for inicio in range(0, longitudes.size, paso):
+        raiz_bloque, _, columna_bloque, _, _ = raices.resolver_raices(dispersion, n_externo + margen, n_maximo - margen, args=(longitudes[inicio:inicio + paso],),
+                                                                       n_muestras=n_muestras)
+        raiz.append(raiz_bloque)
+        columna.append(columna_bloque + inicio)
+    raiz, columna = np.concatenate(raiz), np.concatenate(columna)
+
+    ''' las raices de cada longitud de onda se ordenan de mayor a menor indice efectivo (modo 0 primero) '''
+    orden = np.lexsort((-raiz, columna))
+    raiz, columna = raiz[orden], columna[orden]
+    conteo = np.bincount(columna, minlength=longitudes.size)
+    modo = np.arange(raiz.size) - np.repeat(np.cumsum(conteo) - conteo, conteo)
+    n_efectivo = np.full((longitudes.size, max(int(conteo.max(initial=0)), 1)), np.nan)
+    n_efectivo[columna, modo] = raiz
+    return n_efectivo[0] if np.ndim(longitud_onda) == 0 else n_efectivo
+
+def discretizar_perfil(indice, espesor, n_capas):
+    ''' funcion que discretiza un perfil de indice gradual en capas homogeneas de igual espesor, para usarlo con resolver_multicapa
+
+    Entradas:
+    indice (callable) == funcion indice(x) del perfil, con x en micras entre -espesor/2 (sustrato) y espesor/2 (recubrimiento), acepta arreglos
+    espesor (float) == espesor total de la region gradual en micras
+    n_capas (int) == numero de subcapas
+
+    Retorna: indices y espesores (array 1D) de las subcapas, del sustrato al recubrimiento '''
+
+    bordes = np.linspace(-espesor / 2, espesor / 2, n_capas + 1)
+    centros = (bordes[:-1] + bordes[1:]) / 2 #el indice de cada subcapa es el del perfil en su centro
+    return np.asarray(indice(centros), dtype=float), np.diff(bordes)
\ No newline at end of file
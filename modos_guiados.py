@@ -0,0 +1,147 @@
+import time
+import numpy as np
+import raices
+import modos_opticaRayos as ray
+import modos_opticaOndulatoria as ond
+
+def numero_V(n_core, n_cleavy, espesor, longitud_onda):
+    ''' funcion que calcula la frecuencia normalizada V = (pi*d/lambda)*sqrt(n_core^2 - n_cleavy^2) del guia de onda, que es el valor maximo
+    que puede tomar kappa*d/2 en un modo guiado
+
+    Entradas:
+    n_core (float o array) == indice de refraccion del nucleo del guia de onda
+    n_cleavy (float o array) == indice de refraccion del recubrimiento del guia de onda
+    espesor (float o array) == ancho del nucleo del guia de onda (en micras)
+    longitud_onda (float o array) == longitud de onda de la iluminacion incidente en micras
+
+    Retorna: frecuencia normalizada V (float o array) '''
+
+    numero_onda = 2 * np.pi / np.asarray(longitud_onda, dtype=float) #numero de onda en el vacio k_0
+    return numero_onda * np.asarray(espesor, dtype=float) / 2 * np.sqrt(np.maximum(np.asarray(n_core, dtype=float)**2 - np.asarray(n_cleavy, dtype=float)**2, 0))
+
+def numero_modos(n_core, n_cleavy, espesor, longitud_onda, n_substract=None, polarizacion='TE'):
+    ''' funcion que calcula cuantos modos guia el guia de onda en una polarizacion. En el corte el indice efectivo es igual al mayor indice externo,
+    asi que el modo m esta guiado si m*pi/2 + fase_corte/2 < V, donde V se calcula con el mayor indice externo y fase_corte es la fase de
+    reflexion en la otra interfaz en el corte (cero en un guia de onda simetrico, donde TE y TM tienen el mismo numero de modos)
+
+    Entradas:
+    n_core, n_cleavy, espesor, longitud_onda (float o array) == las mismas de numero_V
+    n_substract (float o array, opcional) == indice de refraccion del sustrato (por defecto es el mismo valor que el recubrimiento)
+    polarizacion (str) == 'TE' o 'TM'
+
+    Retorna: numero de modos guiados (int o array de int) '''
+
+    if n_substract is None or np.array_equal(n_substract, n_cleavy):
+        return np.ceil(2 * numero_V(n_core, n_cleavy, espesor, longitud_onda) / np.pi).astype(int) #guia de onda simetrico
+    n_core = np.asarray(n_core, dtype=float)
+    n_alto, n_bajo = np.maximum(n_cleavy, n_substract), np.minimum(n_cleavy, n_substract) #mayor y menor indice externo
+    rho = 1.0 if polarizacion == 'TE' else (n_core / n_bajo)**2
+    ''' arctan2 da cero en 0/0 (filas simetricas o sin nucleo guiante dentro de un lote asimetrico), donde el cociente daria nan '''
+    fase_corte = np.arctan2(rho * np.sqrt(n_alto**2 - n_bajo**2), np.sqrt(np.maximum(n_core**2 - n_alto**2, 0)))
+    numero = np.ceil((2 * numero_V(n_core, n_alto, espesor, longitud_onda) - fase_corte) / np.pi)
+    return np.maximum(numero, 0).astype(int)
+
+def intervalo_modo(modo, n_core, n_cleavy, espesor, longitud_onda, n_substract=None):
+    ''' funcion que calcula analiticamente el intervalo de angulos en el que esta la raiz de un modo guiado. Las fases de reflexion estan entre 0 y pi/2,
+    asi que kappa*d/2 del modo m esta entre m*pi/2 y (m+1)*pi/2, y ademas no puede superar V (calculado con el mayor indice externo)
+
+    Entradas:
+    modo (int o array) == numero (orden global) del modo
+    n_core, n_cleavy, espesor, longitud_onda (float o array) == parametros del guia de onda
+    n_substract (float o array, opcional) == indice de refraccion del sustrato (por defecto es el mismo valor que el recubrimiento)
+
+    Retorna:
+    angulo_min, angulo_max (float o array) == extremos del intervalo de angulos (en radianes) que contiene la raiz del modo '''
+
+    n_externo = n_cleavy if n_substract is None else np.maximum(n_cleavy, n_substract)
+    V = numero_V(n_core, n_externo, espesor, longitud_onda)
+    u_min = np.minimum(np.asarray(modo) * np.pi / 2, V) #cota inferior de kappa*d/2
+    u_max = np.minimum((np.asarray(modo) + 1) * np.pi / 2, V) #cota superior de kappa*d/2
+    escala = np.pi * np.asarray(n_core, dtype=float) * np.asarray(espesor, dtype=float) / np.asarray(longitud_onda, dtype=float) #kappa*d/2 = escala*cos(angulo)
+
+    ''' kappa decrece con el angulo, por eso la cota superior de kappa*d/2 da el angulo minimo '''
+    angulo_min = np.arccos(np.clip(u_max / escala, 0, 1))
+    angulo_max = np.arccos(np.clip(u_min / escala, 0, 1))
+    return angulo_min, angulo_max
+
+def ecuacion_modo(modelo, polarizacion):
+    ''' funcion que elige la ecuacion trascendente con signo segun el modelo y la polarizacion, con una firma comun
+    ecuacion(angulo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda) en la que modo es el orden global (0, 1, 2, ...)
+
+    Entradas:
+    modelo (str) == 'rayos' u 'ondas'
+    polarizacion (str) == 'TE' o 'TM'
+
+    Retorna: ecuacion (callable) '''
+
+    if polarizacion not in ('TE', 'TM'):
+        raise ValueError(f"polarizacion desconocida: {polarizacion}, debe ser 'TE' o 'TM'")
+    if modelo == 'rayos':
+        ecuacion_rayos = ray.ecuacion_TERayos if polarizacion == 'TE' else ray.ecuacion_TMRayos
+        def ecuacion(angulo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda):
+            return ecuacion_rayos(angulo, n_core, n_cleavy, espesor, modo, n_substract, longitud_onda)
+        return ecuacion
+    if modelo == 'ondas':
+        ''' la ecuacion par con modo m/2 es kappa*d/2 - arctan(...) - m*pi/2, que para m impar coincide con la ecuacion impar del modo (m-1)/2,
+        asi que una sola evaluacion sirve para los modos pares e impares '''
+        ecuacion_pares = ond.ecuacion_TEOndasPares if polarizacion == 'TE' else ond.ecuacion_TMOndasPares
+        def ecuacion(angulo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda):
+            return ecuacion_pares(angulo, np.asarray(modo) / 2, n_core, n_cleavy, espesor, n_substract, longitud_onda)
+        return ecuacion
+    raise ValueError(f"modelo desconocido: {modelo}, debe ser 'rayos' u 'ondas'")
+
+def refinar_modos(modo, n_core, n_cleavy, espesor, n_substract, longitud_onda, polarizacion='TE', modelo='rayos'):
+    ''' funcion que refina con el metodo de Illinois la raiz de una lista de modos guiados, cada uno dentro de su intervalo analitico
+
+    Entradas:
+    modo (array de int) == orden global de cada modo, todos deben ser guiados (modo < numero_modos)
+    n_core, n_cleavy, espesor, n_substract, longitud_onda (array) == parametros del guia de onda de cada modo, con la misma forma de modo
+    polarizacion (str) == 'TE' o 'TM'
+    modelo (str) == 'rayos' u 'ondas'
+
+    Retorna:
+    angulos (array) == angulo de cada modo
+    iteraciones (array) == numero de evaluaciones de la ecuacion que necesito cada modo '''
+
+    inicio = time.perf_counter() if raices.observadores else None
+    ecuacion = ecuacion_modo(modelo, polarizacion)
+    args = (modo, n_core, n_cleavy, espesor, n_substract, longitud_onda)
+    a, b = intervalo_modo(modo, n_core, n_cleavy, espesor, longitud_onda, n_substract)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fa, fb = ecuacion(a, *args), ecuacion(b, *args)
+    angulos, valores, iteraciones, convergido = raices.illinois(ecuacion, a, b, fa, fb, args)
+    if raices.observadores:
+        raices.notificar(f'refinar_modos:{polarizacion}-{modelo}', inicio, iteraciones + 2, iteraciones, valores, convergido, args)
+    return angulos, iteraciones + 2 #se suman las dos evaluaciones de los extremos
+
+def resolver_modos_guiados(n_core, n_cleavy, espesor, longitud_onda, n_substract=None, polarizacion='TE', modelo='rayos', modos_max=None):
+    ''' funcion que calcula todos los modos guiados (y solo esos) de uno o muchos guias de onda, simetricos o asimetricos. Con V se enumeran los
+    modos que existen en cada punto, y cada raiz se refina con el metodo de Illinois dentro de su intervalo analitico, sin gastar evaluaciones en modos en corte
+
+    Entradas:
+    n_core, n_cleavy, espesor, longitud_onda (float o array) == parametros del guia de onda, hacen broadcasting entre si
+    n_substract (float o array, opcional) == indice de refraccion del sustrato (por defecto es el mismo valor que el recubrimiento)
+    polarizacion (str) == 'TE' o 'TM'
+    modelo (str) == 'rayos' u 'ondas'
+    modos_max (int, opcional) == numero de columnas de modos de la salida, por defecto el numero de modos del punto mas multimodo
+
+    Retorna:
+    angulos (array) == angulo de cada modo con forma (forma del broadcasting, modos_max), nan en los modos que no son guiados
+    numero (array) == numero de modos guiados en cada punto '''
+
+    ecuacion_modo(modelo, polarizacion) #se validan el modelo y la polarizacion antes de resolver
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+    parametros = np.broadcast_arrays(*[np.asarray(parametro, dtype=float) for parametro in (n_core, n_cleavy, espesor, n_substract, longitud_onda)])
+    forma = parametros[0].shape
+    n_core, n_cleavy, espesor, n_substract, longitud_onda = [np.ravel(parametro) for parametro in parametros]
+
+    numero = numero_modos(n_core, n_cleavy, espesor, longitud_onda, n_substract, polarizacion)
+    if modos_max is None:
+        modos_max = int(numero.max(initial=0))
+    angulos = np.full((n_core.size, int(modos_max)), np.nan)
+
+    ''' solo entran al metodo de Illinois las parejas (punto, modo) con modo guiado '''
+    punto, modo = np.nonzero(np.arange(int(modos_max)) < numero[:, None])
+    angulos[punto, modo], _ = refinar_modos(modo, n_core[punto], n_cleavy[punto], espesor[punto], n_substract[punto], longitud_onda[punto], polarizacion, modelo)
+    return angulos.reshape(forma + (int(modos_max),)), numero.reshape(forma)
\ No newline at end of file
@@ -1,6 +1,34 @@
 import numpy as np
-from scipy.optimize import minimize
-from scipy.optimize import fsolve
+import raices
+
+def ecuacion_TEOndasPares(angulo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda):
+    ''' ecuacion de los modos pares para los modos TE calculados a partir de la teoria ondulatoria, retorna el valor con signo de la ecuacion trascendente
+    (acepta arreglos de numpy en todas las entradas)
+    ENTRADAS:
+    angulo (float) == angulo del zigzag de la luz en el guia de onda
+    modo (int) == modo del guia de onda que se va a examinar
+    n_core (float) == indice de reefraccion del core del guia de onda
+    n_cleavy (float) == indice de refrarccion del cleavy del guia de onda
+    espesor (float) == espesor del guia de onda en micras
+    n_substract (float) == indice de refraccion del substract del guia de onda
+    longitud_onda (float) == longitud de onda de la iluminacion incidente en el guia de onda, en micras 
+    
+    RETORNA:
+    Valor con signo de la ecuacion trascendente despejada a cero, decrece con el angulo asi que tiene a lo sumo una raiz entre el angulo critico y 90 grados.
+    Si el sustrato es distinto del recubrimiento se usa el promedio de las dos fases, kappa*d = (fase_recubrimiento + fase_sustrato) + m*pi, y
+    par/impar indica si el orden global del modo es par o impar '''
+
+    numero_onda = 2 * np.pi / longitud_onda #numero de onda en el vacio de la iluminacion del guia de onda
+    n_efectivo = n_core * np.sin(angulo) #calculo del indice de refraccion efectivo
+    gamma = numero_onda * np.sqrt(np.maximum(n_efectivo**2 - n_cleavy**2, 0)) #calculo del factor gamma, el cual depende de las condiciones del recubrimiento
+    kappa = numero_onda * np.sqrt(np.maximum(n_core**2 - n_efectivo**2, 0)) #calculo del factor kappa, el cual depende de las condiciones del core
+    if n_substract is None or np.array_equal(n_substract, n_cleavy):
+        fase = np.arctan(gamma/kappa) #guia de onda simetrico, las dos interfaces tienen la misma fase
+    else:
+        gamma_sustrato = numero_onda * np.sqrt(np.maximum(n_efectivo**2 - n_substract**2, 0)) #factor gamma en el sustrato
+        fase = (np.arctan(gamma/kappa) + np.arctan(gamma_sustrato/kappa)) / 2 #fase combinada del recubrimiento y del sustrato
+    ecuacion_trascendente = kappa * espesor/2 - fase - modo*np.pi #tan(kappa*d/2) = gamma/kappa en el caso simetrico, despejada a cero
+    return ecuacion_trascendente #se retorna el valor con signo de la ecuacion trascendente
 
 def modos_TEOndasPares(angulo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda):
     ''' ecuacion de los modos pares para los modos TE calculados a partir de la teoria ondulatoria, retorna el valor absoluto de la ecuacion trascendente
@@ -17,13 +45,36 @@ def modos_TEOndasPares(angulo, modo, n_core, n_cleavy, espesor, n_substract, lon
     RETORNA:
     Valor absoluto del resultado de la ecuacion trascendente despejado a cero, con el fin de minimizar '''
 
-    numero_onda = 2 * np.pi / longitud_onda #numero de onda en el vacio de la iluminacion del guia de onda
+    return np.abs(ecuacion_TEOndasPares(angulo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda)) #valor absoluto de la ecuacion con signo, para poder minimizarla
+
+def ecuacion_TEOndasImpares(angulo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda):
+    ''' ecuacion de los modos impares para los modos TE calculados a partir de la teoria ondulatoria, retorna el valor con signo de la ecuacion trascendente
+    (acepta arreglos de numpy en todas las entradas)
+    ENTRADAS:
+    angulo (float) == angulo del zigzag de la luz en el guia de onda
+    modo (int) == modo del guia de onda que se va a examinar
+    n_core (float) == indice de reefraccion del core del guia de onda
+    n_cleavy (float) == indice de refrarccion del cleavy del guia de onda
+    espesor (float) == espesor del guia de onda en micras
+    n_substract (float) == indice de refraccion del substract del guia de onda
+    longitud_onda (float) == longitud de onda de la iluminacion incidente en el guia de onda, en micras 
+    
+    RETORNA:
+    Valor con signo de la ecuacion trascendente despejada a cero, decrece con el angulo asi que tiene a lo sumo una raiz entre el angulo critico y 90 grados.
+    Si el sustrato es distinto del recubrimiento se usa el promedio de las dos fases, kappa*d = (fase_recubrimiento + fase_sustrato) + m*pi, y
+    par/impar indica si el orden global del modo es par o impar '''
+
+    numero_onda = 2 * np.pi / longitud_onda #numero de onda de la iluminacion del guia de onda
     n_efectivo = n_core * np.sin(angulo) #calculo del indice de refraccion efectivo
-    gamma = numero_onda * np.sqrt(n_efectivo**2 - n_cleavy**2) #calculo del factor gamma, el cual depende de las condiciones del recubrimiento
-    kappa = numero_onda * np.sqrt(n_core**2 - n_efectivo**2) #calculo del factor kappa, el cual depende de las condiciones del core
-    ecuacion_trascendente = kappa/2 - np.arctan((np.sqrt(((numero_onda**2)*(n_core**2 - n_cleavy**2)) - kappa**2))/kappa)
-    ecuacion_absoluto = np.abs(ecuacion_trascendente)
-    return ecuacion_absoluto #se retorna el valor absoluto del valor de la ecuacion trascendente
+    gamma = numero_onda * np.sqrt(np.maximum(n_efectivo**2 - n_cleavy**2, 0)) #calculo del factor gamma, el cual depende de las condiciones del recubrimiento
+    kappa = numero_onda * np.sqrt(np.maximum(n_core**2 - n_efectivo**2, 0)) #calculo del factor kappa, el cual depende de las condiciones del core
+    if n_substract is None or np.array_equal(n_substract, n_cleavy):
+        fase = np.arctan(gamma/kappa) #guia de onda simetrico, las dos interfaces tienen la misma fase
+    else:
+        gamma_sustrato = numero_onda * np.sqrt(np.maximum(n_efectivo**2 - n_substract**2, 0)) #factor gamma en el sustrato
+        fase = (np.arctan(gamma/kappa) + np.arctan(gamma_sustrato/kappa)) / 2 #fase combinada del recubrimiento y del sustrato
+    ecuacion_trascendente = kappa * espesor/2 - fase - np.pi/2 - modo*np.pi #-cot(kappa*d/2) = gamma/kappa en el caso simetrico, despejada a cero
+    return ecuacion_trascendente #se retorna el valor con signo de la ecuacion trascendente
 
 def modos_TEOndasImpares(angulo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda):
     ''' ecuacion de los modos impares para los modos TE calculados a partir de la teoria ondulatoria, retorna el valor absoluto de la ecuacion trascendente
@@ -40,13 +91,7 @@ def modos_TEOndasImpares(angulo, modo, n_core, n_cleavy, espesor, n_substract, l
     RETORNA:
     Valor absoluto del resultado de la ecuacion trascendente despejado a cero, con el fin de minimizar '''
 
-    numero_onda = 2 * np.pi / longitud_onda #numero de onda de la iluminacion del guia de onda
-    n_efectivo = n_core * np.sin(angulo) #calculo del indice de refraccion efectivo
-    gamma = numero_onda * np.sqrt(n_efectivo**2 - n_cleavy**2) #calculo del factor gamma, el cual depende de las condiciones del recubrimiento
-    kappa = numero_onda * np.sqrt(n_core**2 - n_efectivo**2) #calculo del factor kappa, el cual depende de las condiciones del core
-    ecuacion_trascendente = kappa * espesor/2 - np.arctan(-kappa/gamma) + modo*np.pi #calculo del valor de la ecuacion trascendente despejada a cero
-    ecuacion_imparesAbsoluto = np.abs(ecuacion_trascendente) #se calcula el valor absoluto de la funcion despejada a cero para que minimize funcione a cero
-    return ecuacion_imparesAbsoluto #se retorna el valor de la ecuacion trascendente despejado a cero en valor absoluto para minimizarlo
+    return np.abs(ecuacion_TEOndasImpares(angulo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda)) #valor absoluto de la ecuacion con signo, para poder minimizarla
 
 def optimizar_TEOndasPares(modo, n_core, n_cleavy, espesor, n_substract, longitud_onda):
     ''' funcion que calcula el angulo optimo para que la ecuacion trascendente de modos TE sea cero
@@ -61,17 +106,20 @@ def optimizar_TEOndasPares(modo, n_core, n_cleavy, espesor, n_substract, longitu
     
     Retorna:
     angulo_optimo (float) == angulo que hace que la ecuacion trascendente sea aproximadamente cero (en grados)
-    valor_min (float) == valor minimo obtenido en la minimizacion (debe ser cercano a cero si la optimizacion es exitosa) '''
+    valor_min (float) == valor absoluto de la ecuacion trascendente en el angulo optimo (debe ser cercano a cero si el modo es guiado) '''
 
-    angulo_critico = np.arcsin(n_cleavy/n_core) #se calcula el angulo critico del guia de onda
-    angulo_inicial = 1.0001*angulo_critico #se inicia con un valor de angulo critico mas el 0.01% del valor del angulo critico
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+    angulo_critico = np.arcsin(max(n_cleavy, n_substract)/n_core) #se calcula el angulo critico del guia de onda con el mayor indice externo
 
-    ''' ejecucion de la minimizacion utilizando la funcion modos_TE, el punto de partida para el angulo es el angulo critico + el 0.01% del angulo critico,
-    se aplica una restriccion del angulo entre el angulo critico y 90 grados '''
-    resultado = minimize(modos_TEOndasPares, angulo_inicial, args=(modo, n_core, n_cleavy, espesor, n_substract, longitud_onda), bounds=[(angulo_critico, np.pi/2)])
+    ''' la ecuacion con signo decrece con el angulo, asi que su signo en el angulo critico y en 90 grados (n_muestras=2) basta para
+    acotar la raiz, que se refina con el metodo de Illinois. Si no hay raiz el modo no es guiado, se retorna el angulo critico y el valor de la ecuacion en el (distinto de cero) '''
+    angulo_optimo, valor_min = raices.resolver_angulos(ecuacion_TEOndasPares, angulo_critico, args=(modo, n_core, n_cleavy, espesor, n_substract, longitud_onda), n_muestras=2)
+    if np.isnan(angulo_optimo):
+        return angulo_critico, modos_TEOndasPares(angulo_critico, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda)
     
-    # Retornar el angulo optimo encontrado y el valor minimo alcanzado
-    return resultado.x[0], resultado.fun
+    # Retornar el angulo optimo encontrado y el valor de la ecuacion en el
+    return float(angulo_optimo), float(valor_min)
 
 def optimizar_TEOndasImPares(modo, n_core, n_cleavy, espesor, n_substract, longitud_onda):
     ''' funcion que calcula el angulo optimo para que la ecuacion trascendente de modos TE sea cero
@@ -86,17 +134,49 @@ def optimizar_TEOndasImPares(modo, n_core, n_cleavy, espesor, n_substract, longi
     
     Retorna:
     angulo_optimo (float) == angulo que hace que la ecuacion trascendente sea aproximadamente cero (en grados)
-    valor_min (float) == valor minimo obtenido en la minimizacion (debe ser cercano a cero si la optimizacion es exitosa) '''
+    valor_min (float) == valor absoluto de la ecuacion trascendente en el angulo optimo (debe ser cercano a cero si el modo es guiado) '''
 
-    angulo_critico = np.arcsin(n_cleavy/n_core) #se calcula el angulo critico del guia de onda
-    angulo_inicial = 1.0001*angulo_critico #se inicia con un valor de angulo critico mas el 0.01% del valor del angulo critico
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+    angulo_critico = np.arcsin(max(n_cleavy, n_substract)/n_core) #se calcula el angulo critico del guia de onda con el mayor indice externo
 
-    ''' ejecucion de la minimizacion utilizando la funcion modos_TE, el punto de partida para el angulo es el angulo critico + el 0.01% del angulo critico,
-    se aplica una restriccion del angulo entre el angulo critico y 90 grados '''
-    resultado = minimize(modos_TEOndasImpares, angulo_inicial, args=(modo, n_core, n_cleavy, espesor, n_substract, longitud_onda), bounds=[(angulo_critico, np.pi/2)])
+    ''' la ecuacion con signo decrece con el angulo, asi que su signo en el angulo critico y en 90 grados (n_muestras=2) basta para
+    acotar la raiz, que se refina con el metodo de Illinois. Si no hay raiz el modo no es guiado, se retorna el angulo critico y el valor de la ecuacion en el (distinto de cero) '''
+    angulo_optimo, valor_min = raices.resolver_angulos(ecuacion_TEOndasImpares, angulo_critico, args=(modo, n_core, n_cleavy, espesor, n_substract, longitud_onda), n_muestras=2)
+    if np.isnan(angulo_optimo):
+        return angulo_critico, modos_TEOndasImpares(angulo_critico, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda)
     
-    # Retornar el angulo optimo encontrado y el valor minimo alcanzado
-    return resultado.x[0], resultado.fun
+    # Retornar el angulo optimo encontrado y el valor de la ecuacion en el
+    return float(angulo_optimo), float(valor_min)
+
+def ecuacion_TMOndasPares(angulo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda):
+    ''' ecuacion de los modos pares para los modos TM calculados a partir de la teoria ondulatoria, retorna el valor con signo de la ecuacion trascendente
+    (acepta arreglos de numpy en todas las entradas)
+    ENTRADAS:
+    angulo (float) == angulo del zigzag de la luz en el guia de onda
+    modo (int) == modo del guia de onda que se va a examinar
+    n_core (float) == indice de reefraccion del core del guia de onda
+    n_cleavy (float) == indice de refrarccion del cleavy del guia de onda
+    espesor (float) == espesor del guia de onda en micras
+    n_substract (float) == indice de refraccion del substract del guia de onda
+    longitud_onda (float) == longitud de onda de la iluminacion incidente en el guia de onda, en micras 
+    
+    RETORNA:
+    Valor con signo de la ecuacion trascendente despejada a cero, decrece con el angulo asi que tiene a lo sumo una raiz entre el angulo critico y 90 grados.
+    Si el sustrato es distinto del recubrimiento se usa el promedio de las dos fases, kappa*d = (fase_recubrimiento + fase_sustrato) + m*pi, y
+    par/impar indica si el orden global del modo es par o impar '''
+
+    numero_onda = 2*np.pi / longitud_onda #calculo del numero de onda en el vacio k_0
+    n_efectivo = n_core * np.sin(angulo) #calculo del indice de refraccion efectivo
+    kappa = numero_onda * np.sqrt(np.maximum(n_core**2 - n_efectivo**2, 0)) #calculo del parametro kappa que esta relacionado con la onda en el core
+    gamma = numero_onda * np.sqrt(np.maximum(n_efectivo**2 - n_cleavy**2, 0)) #calculo del parametro gamma que esta relacionado con la onda en el cleavy
+    if n_substract is None or np.array_equal(n_substract, n_cleavy):
+        tangente = np.arctan((gamma * n_core**2) / (kappa * n_cleavy**2)) #guia de onda simetrico, las dos interfaces tienen la misma fase
+    else:
+        gamma_sustrato = numero_onda * np.sqrt(np.maximum(n_efectivo**2 - n_substract**2, 0)) #factor gamma en el sustrato
+        tangente = (np.arctan((gamma * n_core**2) / (kappa * n_cleavy**2)) + np.arctan((gamma_sustrato * n_core**2) / (kappa * n_substract**2))) / 2 #fase combinada del recubrimiento y del sustrato
+    ecuacion_trascendente = kappa * espesor/2 - modo*np.pi - tangente #ecuacion trascendente, se debe resolver, esta igualada a cero
+    return ecuacion_trascendente #se retorna el valor con signo de la ecuacion trascendente
 
 def modos_TMOndasPares(angulo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda):
     ''' ecuacion de los modos pares para los modos TM calculados a partir de la teoria ondulatoria, retorna el valor absoluto de la ecuacion trascendente
@@ -113,14 +193,36 @@ def modos_TMOndasPares(angulo, modo, n_core, n_cleavy, espesor, n_substract, lon
     RETORNA:
     Valor absoluto del resultado de la ecuacion trascendente despejado a cero, con el fin de minimizar '''
 
-    numero_onda = 2*np.pi / longitud_onda #calculo del numero de onda en el vacio k_0
+    return np.abs(ecuacion_TMOndasPares(angulo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda)) #valor absoluto de la ecuacion con signo, para poder minimizarla
+
+def ecuacion_TMOndasImpares(angulo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda):
+    ''' ecuacion de los modos impares para los modos TM calculados a partir de la teoria ondulatoria, retorna el valor con signo de la ecuacion trascendente
+    (acepta arreglos de numpy en todas las entradas)
+    ENTRADAS:
+    angulo (float) == angulo del zigzag de la luz en el guia de onda
+    modo (int) == modo del guia de onda que se va a examinar
+    n_core (float) == indice de reefraccion del core del guia de onda
+    n_cleavy (float) == indice de refrarccion del cleavy del guia de onda
+    espesor (float) == espesor del guia de onda en micras
+    n_substract (float) == indice de refraccion del substract del guia de onda
+    longitud_onda (float) == longitud de onda de la iluminacion incidente en el guia de onda, en micras 
+    
+    RETORNA:
+    Valor con signo de la ecuacion trascendente despejada a cero, decrece con el angulo asi que tiene a lo sumo una raiz entre el angulo critico y 90 grados.
+    Si el sustrato es distinto del recubrimiento se usa el promedio de las dos fases, kappa*d = (fase_recubrimiento + fase_sustrato) + m*pi, y
+    par/impar indica si el orden global del modo es par o impar '''
+
+    numero_onda = 2*np.pi/longitud_onda #calculo del numero de onda en el vacio k_0
     n_efectivo = n_core * np.sin(angulo) #calculo del indice de refraccion efectivo
-    kappa = numero_onda * np.sqrt(n_core**2 - n_efectivo**2) #calculo del parametro kappa que esta relacionado con la onda en el core
-    gamma = numero_onda * np.sqrt(n_efectivo**2 - n_cleavy**2) #calculo del parametro gamma que esta relacionado con la onda en el cleavy
-    tangente = np.arctan((gamma*n_core**2)/kappa) #termino de la tangente inversa en la ecuacio trascendente
-    ecuacion_trascendente = kappa * espesor/2 + modo*np.pi - tangente #ecuacion trascendente, se debe resolver, esta igualada a cero
-    ecuacion_trascendenteValorAbsoluto = np.abs(ecuacion_trascendente) #se saca el valor absoluto para que el minimo valor que tome sea cero y se pueda minimizar
-    return ecuacion_trascendenteValorAbsoluto #se retorna el valor absoluto de la ecuacion trascendente, para pooder minimzar esta funcion
+    kappa = numero_onda * np.sqrt(np.maximum(n_core**2 - n_efectivo**2, 0)) #calculo del parametro kappa que esta relacionado con la onda en el core
+    gamma = numero_onda * np.sqrt(np.maximum(n_efectivo**2 - n_cleavy**2, 0)) #calculo del parametro gamma que esta relacionado con la onda en el cleavy
+    if n_substract is None or np.array_equal(n_substract, n_cleavy):
+        tangente = np.arctan((gamma * n_core**2) / (kappa * n_cleavy**2)) #guia de onda simetrico, las dos interfaces tienen la misma fase
+    else:
+        gamma_sustrato = numero_onda * np.sqrt(np.maximum(n_efectivo**2 - n_substract**2, 0)) #factor gamma en el sustrato
+        tangente = (np.arctan((gamma * n_core**2) / (kappa * n_cleavy**2)) + np.arctan((gamma_sustrato * n_core**2) / (kappa * n_substract**2))) / 2 #fase combinada del recubrimiento y del sustrato
+    ecuacion_trascendente = kappa * espesor/2 - np.pi/2 - modo*np.pi - tangente #-cot(kappa*d/2) = (n_core/n_cleavy)^2 gamma/kappa en el caso simetrico, igualada a cero
+    return ecuacion_trascendente #se retorna el valor con signo de la ecuacion trascendente
 
 def modos_TMOndasImpares(angulo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda):
     ''' ecuacion de los modos impares para los modos TM calculados a partir de la teoria ondulatoria, retorna el valor absoluto de la ecuacion trascendente
@@ -137,17 +239,10 @@ def modos_TMOndasImpares(angulo, modo, n_core, n_cleavy, espesor, n_substract, l
     RETORNA:
     Valor absoluto del resultado de la ecuacion trascendente despejado a cero, con el fin de minimizar '''
 
-    numero_onda = 2*np.pi/longitud_onda #calculo del numero de onda en el vacio k_0
-    n_efectivo = n_core * np.sin(angulo) #calculo del indice de refraccion efectivo
-    kappa = numero_onda * np.sqrt(n_core**2 - n_efectivo**2) #calculo del parametro kappa que esta relacionado con la onda en el core
-    gamma = numero_onda * np.sqrt(n_efectivo**2 - n_cleavy**2) #calculo del parametro gamma que esta relacionado con la onda en el cleavy
-    tangente = np.arctan((-kappa) / (gamma * n_core**2)) #termino de la tangente inversa en la ecuacio trascendente
-    ecuacion_trascendente = kappa * espesor/2 + modo*np.pi - tangente #ecuacion trascendente, se debe resolver, esta igualada a cero
-    ecuacion_trascendenteValorAbsoluto = np.abs(ecuacion_trascendente) #se saca el valor absoluto para que el minimo valor que tome sea cero y se pueda minimizar
-    return ecuacion_trascendenteValorAbsoluto #se retorna el valor absoluto de la ecuacion trascendente, para pooder minimzar esta funcion
+    return np.abs(ecuacion_TMOndasImpares(angulo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda)) #valor absoluto de la ecuacion con signo, para poder minimizarla
 
 def optimizar_TMOndasPares(modo, n_core, n_cleavy, espesor, n_substract, longitud_onda):
-    ''' funcion que calcula el angulo optimo para que la ecuacion trascendente de modos TE sea cero
+    ''' funcion que calcula el angulo optimo para que la ecuacion trascendente de modos TM pares sea cero
     
     Entradas:
     n_core (float) == indice de refraccion del nucleo del guia de onda
@@ -159,20 +254,23 @@ def optimizar_TMOndasPares(modo, n_core, n_cleavy, espesor, n_substract, longitu
     
     Retorna:
     angulo_optimo (float) == angulo que hace que la ecuacion trascendente sea aproximadamente cero (en grados)
-    valor_min (float) == valor minimo obtenido en la minimizacion (debe ser cercano a cero si la optimizacion es exitosa) '''
+    valor_min (float) == valor absoluto de la ecuacion trascendente en el angulo optimo (debe ser cercano a cero si el modo es guiado) '''
 
-    angulo_critico = np.arcsin(n_cleavy/n_core) #se calcula el angulo critico del guia de onda
-    angulo_inicial = 1.0001*angulo_critico #se inicia con un valor de angulo critico mas el 0.01% del valor del angulo critico
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+    angulo_critico = np.arcsin(max(n_cleavy, n_substract)/n_core) #se calcula el angulo critico del guia de onda con el mayor indice externo
 
-    ''' ejecucion de la minimizacion utilizando la funcion modos_TE, el punto de partida para el angulo es el angulo critico + el 0.01% del angulo critico,
-    se aplica una restriccion del angulo entre el angulo critico y 90 grados '''
-    resultado = minimize(modos_TMOndasPares, angulo_inicial, args=(modo, n_core, n_cleavy, espesor, n_substract, longitud_onda), bounds=[(angulo_critico, np.pi/2)])
+    ''' la ecuacion con signo decrece con el angulo, asi que su signo en el angulo critico y en 90 grados (n_muestras=2) basta para
+    acotar la raiz, que se refina con el metodo de Illinois. Si no hay raiz el modo no es guiado, se retorna el angulo critico y el valor de la ecuacion en el (distinto de cero) '''
+    angulo_optimo, valor_min = raices.resolver_angulos(ecuacion_TMOndasPares, angulo_critico, args=(modo, n_core, n_cleavy, espesor, n_substract, longitud_onda), n_muestras=2)
+    if np.isnan(angulo_optimo):
+        return angulo_critico, modos_TMOndasPares(angulo_critico, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda)
     
-    # Retornar el angulo optimo encontrado y el valor minimo alcanzado
-    return resultado.x[0], resultado.fun
+    # Retornar el angulo optimo encontrado y el valor de la ecuacion en el
+    return float(angulo_optimo), float(valor_min)
 
 def optimizar_TMOndasImPares(modo, n_core, n_cleavy, espesor, n_substract, longitud_onda):
-    ''' funcion que calcula el angulo optimo para que la ecuacion trascendente de modos TE sea cero
+    ''' funcion que calcula el angulo optimo para que la ecuacion trascendente de modos TM impares sea cero
     
     Entradas:
     n_core (float) == indice de refraccion del nucleo del guia de onda
@@ -184,14 +282,93 @@ def optimizar_TMOndasImPares(modo, n_core, n_cleavy, espesor, n_substract, longi
     
     Retorna:
     angulo_optimo (float) == angulo que hace que la ecuacion trascendente sea aproximadamente cero (en grados)
-    valor_min (float) == valor minimo obtenido en la minimizacion (debe ser cercano a cero si la optimizacion es exitosa) '''
+    valor_min (float) == valor absoluto de la ecuacion trascendente en el angulo optimo (debe ser cercano a cero si el modo es guiado) '''
 
-    angulo_critico = np.arcsin(n_cleavy/n_core) #se calcula el angulo critico del guia de onda
-    angulo_inicial = 1.0001*angulo_critico #se inicia con un valor de angulo critico mas el 0.01% del valor del angulo critico
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+    angulo_critico = np.arcsin(max(n_cleavy, n_substract)/n_core) #se calcula el angulo critico del guia de onda con el mayor indice externo
 
-    ''' ejecucion de la minimizacion utilizando la funcion modos_TE, el punto de partida para el angulo es el angulo critico + el 0.01% del angulo critico,
-    se aplica una restriccion del angulo entre el angulo critico y 90 grados '''
-    resultado = minimize(modos_TMOndasPares, angulo_inicial, args=(modo, n_core, n_cleavy, espesor, n_substract, longitud_onda), bounds=[(angulo_critico, np.pi/2)])
+    ''' la ecuacion con signo decrece con el angulo, asi que su signo en el angulo critico y en 90 grados (n_muestras=2) basta para
+    acotar la raiz, que se refina con el metodo de Illinois. Si no hay raiz el modo no es guiado, se retorna el angulo critico y el valor de la ecuacion en el (distinto de cero) '''
+    angulo_optimo, valor_min = raices.resolver_angulos(ecuacion_TMOndasImpares, angulo_critico, args=(modo, n_core, n_cleavy, espesor, n_substract, longitud_onda), n_muestras=2)
+    if np.isnan(angulo_optimo):
+        return angulo_critico, modos_TMOndasImpares(angulo_critico, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda)
     
-    # Retornar el angulo optimo encontrado y el valor minimo alcanzado
-    return resultado.x[0], resultado.fun
\ No newline at end of file
+    # Retornar el angulo optimo encontrado y el valor de la ecuacion en el
+    return float(angulo_optimo), float(valor_min)
+
+def optimizar_TEOndasParesVectorizado(modos, n_core, n_cleavy, espesor, n_substract, longitud_onda, n_muestras=2):
+    ''' funcion que calcula en bloque los angulos de los modos TE pares, todas las entradas pueden ser arreglos de numpy que hacen broadcasting entre si
+    (por ejemplo modos = np.arange(5) para resolver varios modos a la vez)
+    
+    Entradas:
+    modos (int o array) == numeros de los modos que se quieren calcular
+    n_core, n_cleavy, espesor, n_substract, longitud_onda (float o array) == parametros del guia de onda, igual que en optimizar_TEOndasPares
+    n_muestras (int) == numero de puntos con los que se buscan los cambios de signo entre el angulo critico y 90 grados (con 2, los extremos, basta
+    porque la ecuacion de un modo fijo decrece con el angulo)
+    
+    Retorna:
+    angulos (array) == angulo de cada modo (nan si el modo no es guiado)
+    residuo (array) == valor absoluto de la ecuacion trascendente en cada angulo '''
+
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+    angulo_critico = np.arcsin(np.maximum(n_cleavy, n_substract) / np.asarray(n_core)) #angulo critico de cada guia de onda con el mayor indice externo
+    return raices.resolver_angulos(ecuacion_TEOndasPares, angulo_critico, args=(modos, n_core, n_cleavy, espesor, n_substract, longitud_onda), n_muestras=n_muestras)
+
+def optimizar_TEOndasImParesVectorizado(modos, n_core, n_cleavy, espesor, n_substract, longitud_onda, n_muestras=2):
+    ''' funcion que calcula en bloque los angulos de los modos TE impares, todas las entradas pueden ser arreglos de numpy que hacen broadcasting entre si
+    (por ejemplo modos = np.arange(5) para resolver varios modos a la vez)
+    
+    Entradas:
+    modos (int o array) == numeros de los modos que se quieren calcular
+    n_core, n_cleavy, espesor, n_substract, longitud_onda (float o array) == parametros del guia de onda, igual que en optimizar_TEOndasImPares
+    n_muestras (int) == numero de puntos con los que se buscan los cambios de signo entre el angulo critico y 90 grados (con 2, los extremos, basta
+    porque la ecuacion de un modo fijo decrece con el angulo)
+    
+    Retorna:
+    angulos (array) == angulo de cada modo (nan si el modo no es guiado)
+    residuo (array) == valor absoluto de la ecuacion trascendente en cada angulo '''
+
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+    angulo_critico = np.arcsin(np.maximum(n_cleavy, n_substract) / np.asarray(n_core)) #angulo critico de cada guia de onda con el mayor indice externo
+    return raices.resolver_angulos(ecuacion_TEOndasImpares, angulo_critico, args=(modos, n_core, n_cleavy, espesor, n_substract, longitud_onda), n_muestras=n_muestras)
+
+def optimizar_TMOndasParesVectorizado(modos, n_core, n_cleavy, espesor, n_substract, longitud_onda, n_muestras=2):
+    ''' funcion que calcula en bloque los angulos de los modos TM pares, todas las entradas pueden ser arreglos de numpy que hacen broadcasting entre si
+    (por ejemplo modos = np.arange(5) para resolver varios modos a la vez)
+    
+    Entradas:
+    modos (int o array) == numeros de los modos que se quieren calcular
+    n_core, n_cleavy, espesor, n_substract, longitud_onda (float o array) == parametros del guia de onda, igual que en optimizar_TMOndasPares
+    n_muestras (int) == numero de puntos con los que se buscan los cambios de signo entre el angulo critico y 90 grados (con 2, los extremos, basta
+    porque la ecuacion de un modo fijo decrece con el angulo)
+    
+    Retorna:
+    angulos (array) == angulo de cada modo (nan si el modo no es guiado)
+    residuo (array) == valor absoluto de la ecuacion trascendente en cada angulo '''
+
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+    angulo_critico = np.arcsin(np.maximum(n_cleavy, n_substract) / np.asarray(n_core)) #angulo critico de cada guia de onda con el mayor indice externo
+    return raices.resolver_angulos(ecuacion_TMOndasPares, angulo_critico, args=(modos, n_core, n_cleavy, espesor, n_substract, longitud_onda), n_muestras=n_muestras)
+
+def optimizar_TMOndasImParesVectorizado(modos, n_core, n_cleavy, espesor, n_substract, longitud_onda, n_muestras=2):
+    ''' funcion que calcula en bloque los angulos de los modos TM impares, todas las entradas pueden ser arreglos de numpy que hacen broadcasting entre si
+    (por ejemplo modos = np.arange(5) para resolver varios modos a la vez)
+    
+    Entradas:
+    modos (int o array) == numeros de los modos que se quieren calcular
+    n_core, n_cleavy, espesor, n_substract, longitud_onda (float o array) == parametros del guia de onda, igual que en optimizar_TMOndasImPares
+    n_muestras (int) == numero de puntos con los que se buscan los cambios de signo entre el angulo critico y 90 grados (con 2, los extremos, basta
+    porque la ecuacion de un modo fijo decrece con el angulo)
+    
+    Retorna:
+    angulos (array) == angulo de cada modo (nan si el modo no es guiado)
+    residuo (array) == valor absoluto de la ecuacion trascendente en cada angulo '''
+
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+    angulo_critico = np.arcsin(np.maximum(n_cleavy, n_substract) / np.asarray(n_core)) #angulo critico de cada guia de onda con el mayor indice externo
+    return raices.resolver_angulos(ecuacion_TMOndasImpares, angulo_critico, args=(modos, n_core, n_cleavy, espesor, n_substract, longitud_onda), n_muestras=n_muestras)
\ No newline at end of file
@@ -1,5 +1,71 @@
 import numpy as np
-from scipy.optimize import minimize
+import raices
+
+def fase_reflexionTE(angulo, n_core, n_externo):
+    ''' funcion que calcula la fase de la reflexion total interna de un rayo TE en la interfaz entre el nucleo y un medio externo
+
+    Entradas:
+    angulo (float o array) == angulo con el cual el rayo hace el zig-zag en el guia de onda
+    n_core (float o array) == indice de refraccion del nucleo del guia de onda
+    n_externo (float o array) == indice de refraccion del medio externo (recubrimiento o sustrato)
+
+    Retorna: fase de reflexion (entre 0 y pi/2, es cero por debajo del angulo critico de esa interfaz) '''
+
+    return np.arctan(n_externo / (n_core * np.cos(angulo)) * np.sqrt(np.maximum((n_core**2) * (np.sin(angulo))**2 / (n_externo**2) - 1, 0)))
+
+def fase_reflexionTM(angulo, n_core, n_externo):
+    ''' funcion que calcula la fase de la reflexion total interna de un rayo TM en la interfaz entre el nucleo y un medio externo
+
+    Entradas:
+    angulo (float o array) == angulo con el cual el rayo hace el zig-zag en el guia de onda
+    n_core (float o array) == indice de refraccion del nucleo del guia de onda
+    n_externo (float o array) == indice de refraccion del medio externo (recubrimiento o sustrato)
+
+    Retorna: fase de reflexion (entre 0 y pi/2, es cero por debajo del angulo critico de esa interfaz) '''
+
+    return np.arctan(n_core / (n_externo * np.cos(angulo)) * np.sqrt(np.maximum(((n_core**2) / (n_externo**2) * (np.sin(angulo))**2) - 1, 0)))
+
+def angulo_critico(n_core, n_cleavy, n_substract=None):
+    ''' funcion que calcula el angulo critico del guia de onda, por encima de el hay reflexion total interna en las dos interfaces
+
+    Entradas:
+    n_core, n_cleavy (float o array) == indices de refraccion del nucleo y del recubrimiento
+    n_substract (float o array, opcional) == indice de refraccion del sustrato (por defecto es el mismo valor que el recubrimiento)
+
+    Retorna: angulo critico en radianes, determinado por el mayor de los indices del recubrimiento y del sustrato '''
+
+    n_externo = n_cleavy if n_substract is None else np.maximum(n_cleavy, n_substract)
+    return np.arcsin(np.divide(n_externo, n_core))
+
+def ecuacion_TERayos(angulo, n_core, n_cleavy, espesor, modo, n_substract, longitud_onda):
+    ''' funcion que realiza el calculo de las fases y la ecuacion trascendente (con signo) para modos TE
+    
+    Entradas:
+    n_core (float) == indice de refraccion del core del guia de onda
+    n_cleavy (float) == indice de refraccion del recubrimiento del guia de onda
+    espesor (float) == ancho del core del guia de onda (en micras)
+    angulo (float) == angulo con el cual el rayo hace el zig-zag en el guia de onda
+    modo (int) == numero del modo que se esta intentando evaluar en el guia de onda
+    n_substract (float) == indice de refraccion del sustrato del guia de onda, por defecto es el mismo valor que se pone en el reccubrimiento
+    longitud_onda (float) == longitud de onda de la iluminacion incidente en micras (por defecto es una micra)
+    
+    Retorna: Valor con signo de la ecuacion trascendente usando trazado de rayos, acepta arreglos de numpy en todas las entradas. Si el sustrato
+    es distinto del recubrimiento (guia de onda asimetrico) cada interfaz aporta su propia fase de reflexion. Para un modo fijo la ecuacion
+    decrece con el angulo, asi que tiene a lo sumo una raiz entre el angulo critico y 90 grados'''
+
+    ''' condiciones de iluminacion '''
+    numero_onda = 2 * np.pi / longitud_onda #numero de onda en el vacio k_0
+
+    ''' parametros de fase '''    
+    fase_propagacion = n_core * numero_onda * espesor * np.cos(angulo) #fase acumulada por propagacion
+    fase_recubrimiento = fase_reflexionTE(angulo, n_core, n_cleavy) #fase por reflexion en la superficie con el recubrimiento
+    if n_substract is None or np.array_equal(n_substract, n_cleavy):
+        fase_sustrato = fase_recubrimiento #guia de onda simetrico, no hace falta calcular otra vez la fase
+    else:
+        fase_sustrato = fase_reflexionTE(angulo, n_core, n_substract) #fase por reflexion en la superficie con el sustrato
+    fase_acumulada = 2 * (fase_propagacion - fase_recubrimiento - fase_sustrato) #fase acumulada en un zig-zag
+    ecuacion_trascendente = fase_acumulada - modo * 2 * np.pi #ecuacion trascendente, se debe hacer cero
+    return ecuacion_trascendente #retornamos el valor con signo de la ecuacion tracendente, sus raices son los angulos de los modos propagantes
 
 def modos_TERayos(angulo, n_core, n_cleavy, espesor, modo, n_substract, longitud_onda):
     ''' funcion que realiza el calculo de las fases y la ecuacion trascendednte para modos TE
@@ -16,16 +82,36 @@ def modos_TERayos(angulo, n_core, n_cleavy, espesor, modo, n_substract, longitud
     Retorna: Valor de la ecuacion trascendente usando trazado de rayos (esta funcion esta hecha para ser usada con minimize, los 
     angulos de entrada son solamente puntos de partida desde los cuales inicia la minimizacion)'''
 
+    return np.abs(ecuacion_TERayos(angulo, n_core, n_cleavy, espesor, modo, n_substract, longitud_onda)) #valor absoluto de la ecuacion con signo, tiende a cero en los modos propagantes
+
+def ecuacion_TMRayos(angulo, n_core, n_cleavy, espesor, modo, n_substract, longitud_onda):
+    ''' funcion que realiza el calculo de las fases y la ecuacion trascendente (con signo) para modos TM
+    
+    Entradas:
+    n_core (float) == indice de refraccion del core del guia de onda
+    n_cleavy (float) == indice de refraccion del recubrimiento del guia de onda
+    espesor (float) == ancho del core del guia de onda (en micras)
+    angulo (float) == angulo con el cual el rayo hace el zig-zag en el guia de onda
+    modo (int) == numero del modo que se esta intentando evaluar en el guia de onda
+    n_substract (float) == indice de refraccion del sustrato del guia de onda, por defecto es el mismo valor que se pone en el reccubrimiento
+    longitud_onda (float) == longitud de onda de la iluminacion incidente en micras (por defecto es una micra)
+    
+    Retorna: Valor con signo de la ecuacion trascendente usando trazado de rayos, acepta arreglos de numpy en todas las entradas. Si el sustrato
+    es distinto del recubrimiento (guia de onda asimetrico) cada interfaz aporta su propia fase de reflexion. Para un modo fijo la ecuacion
+    decrece con el angulo, asi que tiene a lo sumo una raiz entre el angulo critico y 90 grados'''
     ''' condiciones de iluminacion '''
     numero_onda = 2 * np.pi / longitud_onda #numero de onda en el vacio k_0
 
     ''' parametros de fase '''    
     fase_propagacion = n_core * numero_onda * espesor * np.cos(angulo) #fase acumulada por propagacion
-    fase_reflexion = np.arctan(n_cleavy / (n_core * np.cos(angulo)) * np.sqrt((n_core**2) * (np.sin(angulo))**2 / (n_cleavy**2) - 1)) #fase por reflexion en las superficies
-    fase_acumulada = 2 * (fase_propagacion - 2 * fase_reflexion) #fase acumulada en un zig-zag
-    ecuacion_trascendente = fase_acumulada - modo * 2 * np.pi #ecuacion trascendente que habria que minimizar
-    ecuacion_valorAbsoluto = np.abs(ecuacion_trascendente) #sacamos el valor absoluto parar evitar los valores negativos, y hacer que la ecuacion trascendente tienda a cero cuando se minimice
-    return ecuacion_valorAbsoluto #retornamos el valor de la ecuacion tracendente, hay que hacer que sea cero para calcular el angulo de los modos propagantes
+    fase_recubrimiento = fase_reflexionTM(angulo, n_core, n_cleavy) #fase por reflexion en la superficie con el recubrimiento
+    if n_substract is None or np.array_equal(n_substract, n_cleavy):
+        fase_sustrato = fase_recubrimiento #guia de onda simetrico, no hace falta calcular otra vez la fase
+    else:
+        fase_sustrato = fase_reflexionTM(angulo, n_core, n_substract) #fase por reflexion en la superficie con el sustrato
+    fase_acumulada = 2 * (fase_propagacion - fase_recubrimiento - fase_sustrato) #fase acumulada en un zig-zag
+    ecuacion_trascendente = fase_acumulada - modo * 2 * np.pi #ecuacion trascendente, se debe hacer cero
+    return ecuacion_trascendente #retornamos el valor con signo de la ecuacion tracendente, sus raices son los angulos de los modos propagantes
 
 def modos_TMRayos(angulo, n_core, n_cleavy, espesor, modo, n_substract, longitud_onda):
     ''' funcion que realiza el calculo de las fases y la ecuacion trascendednte para modos TM
@@ -41,16 +127,8 @@ def modos_TMRayos(angulo, n_core, n_cleavy, espesor, modo, n_substract, longitud
     
     Retorna: Valor de la ecuacion trascendente usando trazado de rayos (esta funcion esta hecha para ser usada con minimize, los 
     angulos de entrada son solamente puntos de partida desde los cuales inicia la minimizacion)'''
-    ''' condiciones de iluminacion '''
-    numero_onda = 2 * np.pi / longitud_onda #numero de onda en el vacio k_0
 
-    ''' parametros de fase '''    
-    fase_propagacion = n_core * numero_onda * espesor * np.cos(angulo) #fase acumulada por propagacion
-    fase_reflexion = np.arctan(n_core / (n_cleavy * np.cos(angulo)) * np.sqrt(((n_core**2) / (n_cleavy**2) * (np.sin(angulo))**2) - 1)) #fase por reflexion en las superficies
-    fase_acumulada = 2 * (fase_propagacion - 2 * fase_reflexion) #fase acumulada en un zig-zag
-    ecuacion_trascendente = fase_acumulada - modo * 2 * np.pi #ecuacion trascendente que habria que minimizar
-    ecuacion_valorAbsoluto = np.abs(ecuacion_trascendente) #sacamos el valor absoluto parar evitar los valores negativos, y hacer que la ecuacion trascendente tienda a cero cuando se minimice
-    return ecuacion_valorAbsoluto #retornamos el valor de la ecuacion tracendente, hay que hacer que sea cero para calcular el angulo de los modos propagantes
+    return np.abs(ecuacion_TMRayos(angulo, n_core, n_cleavy, espesor, modo, n_substract, longitud_onda)) #valor absoluto de la ecuacion con signo, tiende a cero en los modos propagantes
 
 def optimizar_TERayos(n_core, n_cleavy, espesor, modo, n_substract, longitud_onda):
     ''' funcion que calcula el angulo optimo para que la ecuacion trascendente de modos TE sea cero
@@ -65,17 +143,20 @@ def optimizar_TERayos(n_core, n_cleavy, espesor, modo, n_substract, longitud_ond
     
     Retorna:
     angulo_optimo (float) == angulo que hace que la ecuacion trascendente sea aproximadamente cero (en grados)
-    valor_min (float) == valor minimo obtenido en la minimizacion (debe ser cercano a cero si la optimizacion es exitosa) '''
+    valor_min (float) == valor absoluto de la ecuacion trascendente en el angulo optimo (debe ser cercano a cero si el modo es guiado) '''
 
-    angulo_critico = np.arcsin(n_cleavy/n_core) #se calcula el angulo critico del guia de onda
-    angulo_inicial = 1.0001*angulo_critico #se inicia con un valor de angulo critico mas el 0.01% del valor del angulo critico
+    critico = angulo_critico(n_core, n_cleavy, n_substract) #se calcula el angulo critico del guia de onda
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
 
-    ''' ejecucion de la minimizacion utilizando la funcion modos_TE, el punto de partida para el angulo es el angulo critico + el 0.01% del angulo critico,
-    se aplica una restriccion del angulo entre el angulo critico y 90 grados '''
-    resultado = minimize(modos_TERayos, angulo_inicial, args=(n_core, n_cleavy, espesor, modo, n_substract, longitud_onda), bounds=[(angulo_critico, np.pi/2)])
+    ''' la ecuacion TE con signo decrece con el angulo, asi que su signo en el angulo critico y en 90 grados (n_muestras=2) basta para
+    acotar la raiz, que se refina con el metodo de Illinois. Si no hay raiz el modo no es guiado, se retorna el angulo critico y el valor de la ecuacion en el (distinto de cero) '''
+    angulo_optimo, valor_min = raices.resolver_angulos(ecuacion_TERayos, critico, args=(n_core, n_cleavy, espesor, modo, n_substract, longitud_onda), n_muestras=2)
+    if np.isnan(angulo_optimo):
+        return critico, modos_TERayos(critico, n_core, n_cleavy, espesor, modo, n_substract, longitud_onda)
     
-    # Retornar el angulo optimo encontrado y el valor minimo alcanzado
-    return resultado.x[0], resultado.fun
+    # Retornar el angulo optimo encontrado y el valor de la ecuacion en el
+    return float(angulo_optimo), float(valor_min)
 
 def optimizar_TMRayos(n_core, n_cleavy, espesor, modo, n_substract=None, longitud_onda=1):
     ''' funcion que calcula el angulo optimo para que la ecuacion trascendente de modos TM sea cero
@@ -90,14 +171,55 @@ def optimizar_TMRayos(n_core, n_cleavy, espesor, modo, n_substract=None, longitu
     
     Retorna:
     angulo_optimo (float) == angulo que hace que la ecuacion trascendente sea aproximadamente cero (en grados)
-    valor_min (float) == valor minimo obtenido en la minimizacion (debe ser cercano a cero si la optimizacion es exitosa) '''
+    valor_min (float) == valor absoluto de la ecuacion trascendente en el angulo optimo (debe ser cercano a cero si el modo es guiado) '''
+    
+    critico = angulo_critico(n_core, n_cleavy, n_substract) #se calcula el angulo critico del guia de onda
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+
+    ''' la ecuacion TM con signo decrece con el angulo, asi que su signo en el angulo critico y en 90 grados (n_muestras=2) basta para
+    acotar la raiz, que se refina con el metodo de Illinois. Si no hay raiz el modo no es guiado, se retorna el angulo critico y el valor de la ecuacion en el (distinto de cero) '''
+    angulo_optimo, valor_min = raices.resolver_angulos(ecuacion_TMRayos, critico, args=(n_core, n_cleavy, espesor, modo, n_substract, longitud_onda), n_muestras=2)
+    if np.isnan(angulo_optimo):
+        return critico, modos_TMRayos(critico, n_core, n_cleavy, espesor, modo, n_substract, longitud_onda)
+    
+    # Retornar el angulo optimo encontrado y el valor de la ecuacion en el
+    return float(angulo_optimo), float(valor_min)
+
+def optimizar_TERayosVectorizado(n_core, n_cleavy, espesor, modos, n_substract, longitud_onda, n_muestras=2):
+    ''' funcion que calcula en bloque los angulos de los modos TE, todas las entradas pueden ser arreglos de numpy que hacen broadcasting entre si
+    (por ejemplo modos = np.arange(5) para resolver varios modos a la vez)
+    
+    Entradas:
+    n_core, n_cleavy, espesor, n_substract, longitud_onda (float o array) == parametros del guia de onda, igual que en optimizar_TERayos
+    modos (int o array) == numeros de los modos que se quieren calcular
+    n_muestras (int) == numero de puntos con los que se buscan los cambios de signo entre el angulo critico y 90 grados (con 2, los extremos, basta
+    porque la ecuacion de un modo fijo decrece con el angulo)
     
-    angulo_critico = np.arcsin(n_cleavy/n_core) #se calcula el angulo critico del guia de onda
-    angulo_inicial = 1.0001*angulo_critico #se inicia con un valor de angulo critico mas el 0.01% del valor del angulo critico
+    Retorna:
+    angulos (array) == angulo de cada modo (nan si el modo no es guiado)
+    residuo (array) == valor absoluto de la ecuacion trascendente en cada angulo '''
 
-    ''' ejecucion de la minimizacion utilizando la funcion modos_TM, el punto de partida para el angulo es el angulo critico + el 0.01% del angulo critico,
-    se aplica una restriccion del angulo entre el angulo critico y 90 grados '''
-    resultado = minimize(modos_TMRayos, angulo_inicial, args=(n_core, n_cleavy, espesor, modo, n_substract, longitud_onda), bounds=[(angulo_critico, np.pi/2)])
+    critico = angulo_critico(n_core, n_cleavy, n_substract) #angulo critico de cada guia de onda
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+    return raices.resolver_angulos(ecuacion_TERayos, critico, args=(n_core, n_cleavy, espesor, modos, n_substract, longitud_onda), n_muestras=n_muestras)
+
+def optimizar_TMRayosVectorizado(n_core, n_cleavy, espesor, modos, n_substract, longitud_onda, n_muestras=2):
+    ''' funcion que calcula en bloque los angulos de los modos TM, todas las entradas pueden ser arreglos de numpy que hacen broadcasting entre si
+    (por ejemplo modos = np.arange(5) para resolver varios modos a la vez)
     
-    # Retornar el angulo optimo encontrado y el valor minimo alcanzado
-    return resultado.x[0], resultado.fun
\ No newline at end of file
+    Entradas:
+    n_core, n_cleavy, espesor, n_substract, longitud_onda (float o array) == parametros del guia de onda, igual que en optimizar_TMRayos
+    modos (int o array) == numeros de los modos que se quieren calcular
+    n_muestras (int) == numero de puntos con los que se buscan los cambios de signo entre el angulo critico y 90 grados (con 2, los extremos, basta
+    porque la ecuacion de un modo fijo decrece con el angulo)
+    
+    Retorna:
+    angulos (array) == angulo de cada modo (nan si el modo no es guiado)
+    residuo (array) == valor absoluto de la ecuacion trascendente en cada angulo '''
+
+    critico = angulo_critico(n_core, n_cleavy, n_substract) #angulo critico de cada guia de onda
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+    return raices.resolver_angulos(ecuacion_TMRayos, critico, args=(n_core, n_cleavy, espesor, modos, n_substract, longitud_onda), n_muestras=n_muestras)
\ No newline at end of file
@@ -0,0 +1,165 @@
+import numpy as np
+
+def parametros_modo(angulos, modos, n_core, n_cleavy, espesor, longitud_onda, n_substract=None, polarizacion='TE'):
+    ''' funcion que recupera kappa y gamma de modos ya resueltos y calcula los parametros analiticos de su perfil transversal. Con el nucleo centrado
+    en x = 0 (recubrimiento en x > d/2, sustrato en x < -d/2) el campo es cos(kappa*x - psi) en el nucleo y decae como exponencial afuera, con
+    psi = (phi_sustrato - phi_recubrimiento)/2 + m*pi/2
+
+    Entradas:
+    angulos (array) == angulo de cada modo (el que retornan los optimizar_* o resolver_modos_guiados), nan si el modo no es guiado
+    modos (array) == orden global de cada modo
+    n_core, n_cleavy, espesor, longitud_onda (float) == parametros del guia de onda
+    n_substract (float, opcional) == indice de refraccion del sustrato (por defecto es el mismo valor que el recubrimiento)
+    polarizacion (str) == 'TE' (el perfil es E_y) o 'TM' (el perfil es H_y)
+
+    Retorna: diccionario con arreglos por modo: 'kappa', 'gamma_recubrimiento', 'gamma_sustrato', 'psi', 'amplitud' (factor que normaliza a uno
+    la integral de |campo|^2 en TE o de |campo|^2/n^2 en TM, las dos proporcionales a la potencia del modo) y 'confinamiento' (fraccion de esa
+    integral dentro del nucleo) '''
+
+    if polarizacion not in ('TE', 'TM'):
+        raise ValueError(f"polarizacion desconocida: {polarizacion}, debe ser 'TE' o 'TM'")
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+    angulos = np.asarray(angulos, dtype=float)
+    modos = np.asarray(modos)
+    numero_onda = 2 * np.pi / longitud_onda #numero de onda en el vacio k_0
+    n_efectivo = n_core * np.sin(angulos)
+    kappa = numero_onda * n_core * np.cos(angulos)
+    gamma_c = numero_onda * np.sqrt(np.maximum(n_efectivo**2 - n_cleavy**2, 0))
+    gamma_s = numero_onda * np.sqrt(np.maximum(n_efectivo**2 - n_substract**2, 0))
+
+    ''' fases de reflexion en cada interfaz (con el factor (n_core/n)^2 en TM, por la continuidad de H_y/n^2) '''
+    rho_c, rho_s = (1.0, 1.0) if polarizacion == 'TE' else ((n_core / n_cleavy)**2, (n_core / n_substract)**2)
+    fase_c = np.arctan(rho_c * gamma_c / kappa)
+    fase_s = np.arctan(rho_s * gamma_s / kappa)
+    psi = (fase_s - fase_c) / 2 + modos * np.pi / 2
+
+    ''' integrales analiticas de cos^2 en el nucleo y de las exponenciales en el recubrimiento y el sustrato '''
+    integral_core = espesor / 2 + (np.sin(2 * fase_c) + np.sin(2 * fase_s)) / (4 * kappa)
+    integral_c = np.cos(fase_c)**2 / (2 * gamma_c)
+    integral_s = np.cos(fase_s)**2 / (2 * gamma_s)
+    if polarizacion == 'TM':
+        ''' en TM la potencia lleva el peso 1/n^2 de cada region, con ese peso los modos guiados son ortogonales '''
+        integral_core, integral_c, integral_s = integral_core / n_core**2, integral_c / n_cleavy**2, integral_s / n_substract**2
+    total = integral_core + integral_c + integral_s
+    return {'kappa': kappa, 'gamma_recubrimiento': gamma_c, 'gamma_sustrato': gamma_s, 'psi': psi, 'amplitud': 1 / np.sqrt(total),
+            'confinamiento': integral_core / total}
+
+def perfiles_campo(angulos, modos, x, n_core, n_cleavy, espesor, longitud_onda, n_substract=None, polarizacion='TE', salida=None, tamano_bloque=1048576):
+    ''' funcion que evalua los perfiles transversales normalizados de todos los modos a la vez sobre una malla x, por bloques de la malla para no
+    crear copias intermedias del tamano de la salida
+
+    Entradas:
+    angulos, modos (array) == angulos y orden global de los modos, como en parametros_modo
+    x (array 1D) == malla transversal en micras, con el nucleo entre -espesor/2 y espesor/2
+    n_core, n_cleavy, espesor, longitud_onda, n_substract, polarizacion == parametros del guia de onda, como en parametros_modo
+    salida (array, opcional) == arreglo preasignado (puede ser np.memmap) de forma (numero de modos, x.size) donde se escriben los perfiles
+    tamano_bloque (int) == numero maximo de elementos (modos por puntos de la malla) de cada bloque, acota el tamano de los temporales
+
+    Retorna: perfiles (array de forma (numero de modos, x.size)) normalizados como en parametros_modo, filas en nan para modos no guiados '''
+
+    x = np.asarray(x, dtype=float)
+    parametros = parametros_modo(angulos, modos, n_core, n_cleavy, espesor, longitud_onda, n_substract, polarizacion)
+    kappa, psi, amplitud = (parametros[nombre][:, None] for nombre in ('kappa', 'psi', 'amplitud'))
+    gamma_c, gamma_s = parametros['gamma_recubrimiento'][:, None], parametros['gamma_sustrato'][:, None]
+    borde_c = amplitud * np.cos(kappa * espesor / 2 - psi) #valor del campo en la interfaz con el recubrimiento
+    borde_s = amplitud * np.cos(-kappa * espesor / 2 - psi) #valor del campo en la interfaz con el sustrato
+    if salida is None:
+        salida = np.empty((kappa.shape[0], x.size))
+
+    paso = _paso_bloque(kappa.shape[0], tamano_bloque)
+    for inicio in range(0, x.size, paso):
+        xb = x[inicio:inicio + paso]
+        bloque = salida[:, inicio:inicio + paso]
+        nucleo, recubrimiento = np.abs(xb) <= espesor / 2, xb > espesor / 2
+        sustrato = ~(nucleo | recubrimiento)
+
+        ''' en cada region se evalua una sola expresion, sobre un buffer del tamano del bloque '''
+        for region, evaluar in ((nucleo, lambda xr: amplitud * np.cos(kappa * xr - psi)),
+                                (recubrimiento, lambda xr: borde_c * np.exp(-gamma_c * (xr - espesor / 2))),
+                                (sustrato, lambda xr: borde_s * np.exp(gamma_s * (xr + espesor / 2)))):
+            if region.all():
+                bloque[...] = evaluar(xb)
+            elif region.any():
+                bloque[:, region] = evaluar(xb[region])
+    return salida
+
+def pesos_integracion(x):
+    ''' pesos de la regla del trapecio sobre una malla x (no necesariamente uniforme), para integrar con un producto punto '''
+
+    x = np.asarray(x, dtype=float)
+    pesos = np.zeros(x.size)
+    if x.size > 1:
+        dx = np.diff(x)
+        pesos[:-1] += dx / 2
+        pesos[1:] += dx / 2
+    return pesos
+
+def indice_malla(x, n_core, n_cleavy, espesor, n_substract=None):
+    ''' indice de refraccion sobre la malla x, con el nucleo entre -espesor/2 y espesor/2, el recubrimiento arriba y el sustrato abajo '''
+
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+    x = np.asarray(x, dtype=float)
+    return np.where(np.abs(x) <= espesor / 2, n_core, np.where(x > espesor / 2, n_cleavy, n_substract))
+
+def _paso_bloque(filas, tamano_bloque):
+    ''' numero de puntos de la malla por bloque para que cada bloque tenga a lo sumo tamano_bloque elementos '''
+
+    return max(int(tamano_bloque) // max(int(filas), 1), 1)
+
+def _pesos_modo(x, polarizacion, indice):
+    ''' pesos de la regla del trapecio con el peso 1/n^2 de la potencia en TM (los perfiles TM son H_y) '''
+
+    if polarizacion not in ('TE', 'TM'):
+        raise ValueError(f"polarizacion desconocida: {polarizacion}, debe ser 'TE' o 'TM'")
+    pesos = pesos_integracion(x)
+    if polarizacion == 'TM':
+        if indice is None:
+            raise ValueError('para perfiles TM hay que dar el indice de refraccion sobre la malla (por ejemplo con indice_malla)')
+        pesos /= np.broadcast_to(np.asarray(indice, dtype=float), pesos.shape)**2
+    return pesos
+
+def integrales_solapamiento(perfiles, x, otros=None, polarizacion='TE', indice=None, tamano_bloque=1048576):
+    ''' funcion que calcula las integrales de solapamiento entre modos, O_ij = integral de campo_i(x)*campo_j(x) dx en TE o de
+    campo_i(x)*campo_j(x)/n(x)^2 dx en TM (regla del trapecio), acumulando productos de matrices por bloques de la malla para no copiar los
+    perfiles completos. Con perfiles de perfiles_campo la matriz de los modos guiados es la identidad en las dos polarizaciones
+
+    Entradas:
+    perfiles (array) == perfiles de forma (numero de modos, x.size), por ejemplo la salida de perfiles_campo (puede ser np.memmap)
+    x (array 1D) == malla transversal en la que estan evaluados los perfiles
+    otros (array, opcional) == otro conjunto de perfiles sobre la misma malla, por defecto se usan los mismos perfiles
+    polarizacion (str) == 'TE' (perfiles E_y) o 'TM' (perfiles H_y)
+    indice (array, opcional) == indice de refraccion sobre la malla (ver indice_malla), obligatorio en TM
+    tamano_bloque (int) == numero maximo de elementos (modos por puntos de la malla) de cada bloque
+
+    Retorna: matriz de solapamiento de forma (numero de modos, numero de modos de otros) '''
+
+    otros = perfiles if otros is None else otros
+    pesos = _pesos_modo(x, polarizacion, indice)
+    solapamiento = np.zeros((perfiles.shape[0], otros.shape[0]))
+    paso = _paso_bloque(max(perfiles.shape[0], otros.shape[0]), tamano_bloque)
+    for inicio in range(0, pesos.size, paso):
+        bloque = slice(inicio, inicio + paso)
+        solapamiento += (perfiles[:, bloque] * pesos[bloque]) @ np.asarray(otros[:, bloque]).T
+    return solapamiento
+
+def confinamiento_malla(perfiles, x, espesor, polarizacion='TE', indice=None, tamano_bloque=1048576):
+    ''' funcion que calcula el factor de confinamiento de cada perfil sobre la malla: fraccion de la integral de |campo|^2 (de |campo|^2/n^2 en
+    TM) dentro del nucleo, por bloques de la malla (parametros_modo da el valor analitico, esta version sirve para perfiles que no vienen de la
+    solucion analitica)
+
+    Entradas: perfiles, x, polarizacion, indice y tamano_bloque como en integrales_solapamiento, espesor (float) == ancho del nucleo en micras
+
+    Retorna: factor de confinamiento de cada modo (array) '''
+
+    x = np.asarray(x, dtype=float)
+    pesos = _pesos_modo(x, polarizacion, indice)
+    nucleo, total = np.zeros(perfiles.shape[0]), np.zeros(perfiles.shape[0])
+    paso = _paso_bloque(perfiles.shape[0], tamano_bloque)
+    for inicio in range(0, x.size, paso):
+        bloque = slice(inicio, inicio + paso)
+        cuadrado = np.abs(perfiles[:, bloque])**2
+        nucleo += cuadrado @ (pesos[bloque] * (np.abs(x[bloque]) <= espesor / 2))
+        total += cuadrado @ pesos[bloque]
+    return nucleo / total
@@ -0,0 +1,164 @@
+import time
+import numpy as np
+
+''' funciones que reciben un registro (diccionario) por cada solucion, ver instrumentacion.py. Si la lista esta vacia no se mide nada '''
+observadores = []
+
+def notificar(origen, inicio, evaluaciones, iteraciones, residuo, convergido, parametros, parametros_sin_intervalo=()):
+    ''' funcion que arma el registro de una solucion y se lo entrega a todos los observadores
+
+    Entradas:
+    origen (str) == funcion y ecuacion que produjeron las raices
+    inicio (float) == time.perf_counter() al comienzo de la solucion
+    evaluaciones, iteraciones, residuo, convergido (array) == datos de cada raiz
+    parametros (tuple) == argumentos de la ecuacion de cada raiz
+    parametros_sin_intervalo (tuple, opcional) == argumentos de la ecuacion de cada problema en el que no se encontro ningun cambio de signo '''
+
+    sin_intervalo = int(np.size(parametros_sin_intervalo[0])) if len(parametros_sin_intervalo) else 0
+    registro = {'origen': origen, 'tiempo': time.perf_counter() - inicio, 'raices': int(np.size(residuo)), 'evaluaciones': np.asarray(evaluaciones),
+                'iteraciones': np.asarray(iteraciones), 'residuo': np.abs(residuo), 'convergido': np.asarray(convergido), 'parametros': parametros,
+                'sin_intervalo': sin_intervalo, 'parametros_sin_intervalo': parametros_sin_intervalo}
+    for observador in observadores:
+        observador(registro)
+
+def buscar_cambios_signo(funcion, limite_inferior, limite_superior, args=(), n_muestras=64):
+    ''' funcion que busca, para muchos problemas a la vez, los intervalos donde la funcion cambia de signo
+
+    Entradas:
+    funcion (callable) == funcion con signo f(x, *args), debe aceptar arreglos de numpy y hacer broadcasting
+    limite_inferior (float o array) == limite inferior del intervalo de busqueda de cada problema
+    limite_superior (float o array) == limite superior del intervalo de busqueda de cada problema
+    args (tuple) == parametros adicionales de la funcion, cada uno escalar o arreglo (un valor por problema)
+    n_muestras (int) == numero de puntos con los que se muestrea cada intervalo (minimo 2, que son los extremos)
+
+    Retorna:
+    a, b (array) == extremos de cada intervalo en el que hay un cambio de signo
+    fa, fb (array) == valor de la funcion en los extremos de cada intervalo
+    columna (array) == indice del problema (sobre los argumentos aplanados) al que pertenece cada intervalo
+    args_planos (tuple) == argumentos con broadcasting y aplanados, para reutilizarlos en el refinamiento '''
+
+    ''' se lleva todo a arreglos planos de la misma forma, un elemento por problema '''
+    planos = np.broadcast_arrays(np.asarray(limite_inferior, dtype=float), np.asarray(limite_superior, dtype=float), *[np.asarray(arg) for arg in args])
+    planos = [np.ravel(arreglo) for arreglo in planos]
+    inferior, superior, args_planos = planos[0], planos[1], tuple(planos[2:])
+
+    ''' muestreo de todos los intervalos a la vez, la malla tiene forma (n_muestras, numero de problemas) '''
+    fraccion = np.linspace(0, 1, max(int(n_muestras), 2))[:, None] #fraccion del intervalo en la que cae cada muestra
+    malla = inferior + (superior - inferior) * fraccion #puntos de muestreo
+    with np.errstate(divide='ignore', invalid='ignore'):
+        valores = funcion(malla, *args_planos) #evaluacion de la funcion en toda la malla de una sola vez
+    valores = np.broadcast_to(valores, malla.shape)
+
+    ''' un intervalo tiene raiz si los signos de sus extremos son opuestos o si el extremo derecho es exactamente cero '''
+    signo = np.sign(valores)
+    cambio = (signo[:-1] * signo[1:] < 0) | (signo[1:] == 0)
+    fila, columna = np.nonzero(cambio)
+    a, b = malla[fila, columna], malla[fila + 1, columna]
+    fa, fb = valores[fila, columna], valores[fila + 1, columna]
+    return a, b, fa, fb, columna, args_planos
+
+def illinois(funcion, a, b, fa, fb, args=(), xtol=1e-12, ftol=1e-12, max_iter=100):
+    ''' metodo de Illinois (regula falsi modificada) vectorizado, refina todas las raices a la vez dentro de intervalos con cambio de signo
+
+    Entradas:
+    funcion (callable) == funcion con signo f(x, *args), debe aceptar arreglos de numpy
+    a, b (array) == extremos de los intervalos, la funcion debe tener signo opuesto en ellos (o ser cero en alguno)
+    fa, fb (array) == valores de la funcion en a y b
+    args (tuple) == parametros adicionales de la funcion, un valor por intervalo
+    xtol (float) == tolerancia en el ancho del intervalo
+    ftol (float) == tolerancia en el valor absoluto de la funcion
+    max_iter (int) == numero maximo de iteraciones
+
+    Retorna:
+    raiz (array) == aproximacion de la raiz en cada intervalo
+    valor (array) == valor de la funcion en la raiz
+    iteraciones (array) == numero de evaluaciones de la funcion que necesito cada raiz
+    convergido (array) == True si la raiz cumple alguna de las tolerancias '''
+
+    a, b = np.array(a, dtype=float), np.array(b, dtype=float) #copias, para no modificar los arreglos de entrada
+    fa, fb = np.array(fa, dtype=float), np.array(fb, dtype=float)
+    args = [np.asarray(arg) for arg in args]
+
+    ''' si algun extremo ya es raiz se deja como solucion, se intercambian para que b sea siempre la mejor aproximacion '''
+    intercambio = np.abs(fa) < np.abs(fb)
+    a[intercambio], b[intercambio] = b[intercambio], a[intercambio]
+    fa[intercambio], fb[intercambio] = fb[intercambio], fa[intercambio]
+    iteraciones = np.zeros(a.shape, dtype=int)
+    activo = (np.abs(fb) > ftol) & (np.abs(b - a) > xtol) #problemas que aun no han convergido
+
+    for _ in range(max_iter):
+        indices = np.nonzero(activo)[0]
+        if indices.size == 0:
+            break
+        ai, bi, fai, fbi = a[indices], b[indices], fa[indices], fb[indices]
+        c = bi - fbi * (bi - ai) / (fbi - fai) #paso de la secante (regula falsi)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fc = funcion(c, *[arg[indices] for arg in args])
+        iteraciones[indices] += 1
+
+        ''' si c y b tienen signo opuesto el intervalo pasa a ser [b, c], si no se conserva a y se divide fa por 2 (modificacion de Illinois) '''
+        opuesto = np.sign(fc) != np.sign(fbi)
+        ai = np.where(opuesto, bi, ai)
+        fai = np.where(opuesto, fbi, fai / 2)
+        a[indices], fa[indices] = ai, fai
+        b[indices], fb[indices] = c, fc
+        activo[indices] = (np.abs(fc) > ftol) & (np.abs(c - ai) > xtol)
+
+    convergido = (np.abs(fb) <= ftol) | (np.abs(b - a) <= xtol)
+    return b, fb, iteraciones, convergido
+
+def resolver_raices(funcion, limite_inferior, limite_superior, args=(), n_muestras=64, xtol=1e-12, ftol=1e-12, max_iter=100):
+    ''' funcion que encuentra todas las raices de una funcion con signo para muchos problemas a la vez: primero busca los cambios
+    de signo en una malla y luego refina todas las raices juntas con el metodo de Illinois
+
+    Entradas:
+    funcion (callable) == funcion con signo f(x, *args), debe aceptar arreglos de numpy
+    limite_inferior, limite_superior (float o array) == intervalo de busqueda de cada problema
+    args (tuple) == parametros adicionales de la funcion, escalares o arreglos (un valor por problema)
+    n_muestras (int) == numero de puntos de la malla con la que se buscan los cambios de signo
+    xtol, ftol, max_iter == tolerancias y numero maximo de iteraciones del metodo de Illinois
+
+    Retorna:
+    raices (array) == todas las raices encontradas
+    valores (array) == valor de la funcion en cada raiz
+    columna (array) == indice del problema (sobre los argumentos aplanados) al que pertenece cada raiz
+    iteraciones (array) == numero de evaluaciones que necesito cada raiz en el refinamiento
+    convergido (array) == True si la raiz cumple las tolerancias '''
+
+    inicio = time.perf_counter() if observadores else None
+    a, b, fa, fb, columna, args_planos = buscar_cambios_signo(funcion, limite_inferior, limite_superior, args, n_muestras)
+    args_raiz = tuple(arg[columna] for arg in args_planos) #argumentos que le corresponden a cada intervalo
+    raices, valores, iteraciones, convergido = illinois(funcion, a, b, fa, fb, args_raiz, xtol, ftol, max_iter)
+    if observadores:
+        ''' a las iteraciones de Illinois se suman las evaluaciones de la malla de busqueda de cada problema. Los problemas sin ningun cambio de
+        signo (modo en corte o raiz que la malla no detecto) se registran aparte, porque no dejan ninguna raiz que marcar como no convergida '''
+        problemas = int(np.prod(np.broadcast_shapes(np.shape(limite_inferior), np.shape(limite_superior), *[np.shape(arg) for arg in args])))
+        sin_intervalo = np.ones(problemas, dtype=bool)
+        sin_intervalo[columna] = False
+        args_sin_intervalo = tuple(np.broadcast_to(arg, sin_intervalo.shape)[sin_intervalo] for arg in args_planos)
+        notificar('resolver_raices:' + getattr(funcion, '__name__', 'funcion'), inicio, iteraciones + max(int(n_muestras), 2), iteraciones, valores, convergido,
+                  args_raiz, args_sin_intervalo)
+    return raices, valores, columna, iteraciones, convergido
+
+def resolver_angulos(ecuacion, angulo_critico, args=(), n_muestras=64, xtol=1e-12, ftol=1e-12, max_iter=100):
+    ''' funcion que resuelve en bloque la ecuacion trascendente (con signo) de un guia de onda, buscando el angulo entre el angulo critico y 90 grados.
+    Para un modo fijo la ecuacion tiene a lo sumo una raiz en ese intervalo
+
+    Entradas:
+    ecuacion (callable) == ecuacion trascendente con signo, ecuacion(angulo, *args)
+    angulo_critico (float o array) == angulo critico de cada problema (en radianes)
+    args (tuple) == parametros de la ecuacion, escalares o arreglos que hacen broadcasting entre si
+    n_muestras, xtol, ftol, max_iter == parametros de resolver_raices
+
+    Retorna:
+    angulos (array) == angulo solucion de cada problema con la forma del broadcasting de los argumentos (nan si el modo no es guiado)
+    residuo (array) == valor absoluto de la ecuacion en cada angulo (nan si el modo no es guiado) '''
+
+    forma = np.broadcast_shapes(np.shape(angulo_critico), *[np.shape(arg) for arg in args]) #forma final de la solucion
+    raices, valores, columna, iteraciones, convergido = resolver_raices(ecuacion, angulo_critico, np.pi/2, args, n_muestras, xtol, ftol, max_iter)
+
+    angulos = np.full(int(np.prod(forma)), np.nan)
+    residuo = np.full(int(np.prod(forma)), np.nan)
+    angulos[columna[::-1]] = raices[::-1] #si hubiera mas de una raiz por problema se queda la primera
+    residuo[columna[::-1]] = np.abs(valores[::-1])
+    return angulos.reshape(forma), residuo.reshape(forma)
\ No newline at end of file
@@ -0,0 +1,266 @@
+import json
+from bisect import bisect_right
+import numpy as np
+import barrido
+import modos_guiados
+
+''' formato del archivo: firma de 8 bytes, longitud del encabezado (uint64 little endian), encabezado JSON con los ejes y los parametros fijos,
+relleno hasta un multiplo de 64 bytes y despues los datos crudos en orden C, asi que se pueden abrir con np.memmap sin leerlos '''
+firma = b'TABLANEF'
+alineacion = 64
+polarizaciones = ('TE', 'TM')
+
+class TablaIndiceEfectivo:
+    ''' tabla precalculada del indice efectivo de los modos TE y TM sobre una malla (longitud de onda, espesor, delta_n), con
+    n_core = n_cleavy + delta_n, para reemplazar al solucionador en ciclos internos por una interpolacion
+
+    Entradas:
+    longitud_onda, espesor, delta_n (array 1D) == ejes de la malla, estrictamente crecientes
+    datos (array o np.memmap) == indices efectivos de forma (longitud_onda.size, espesor.size, delta_n.size, 2, modos_max), el eje 3 es la
+    polarizacion (TE, TM), nan donde el modo no es guiado
+    n_cleavy (float) == indice de refraccion del recubrimiento
+    n_substract (float, opcional) == indice de refraccion del sustrato (por defecto el mismo del recubrimiento)
+    modelo (str) == modelo con el que se construyo la tabla, 'rayos' u 'ondas' '''
+
+    def __init__(self, longitud_onda, espesor, delta_n, datos, n_cleavy, n_substract=None, modelo='rayos'):
+        self.ejes = tuple(np.asarray(eje, dtype=float) for eje in (longitud_onda, espesor, delta_n))
+        for eje in self.ejes:
+            if eje.ndim != 1 or eje.size < 2 or np.any(np.diff(eje) <= 0):
+                raise ValueError('los ejes de la tabla deben ser arreglos 1D estrictamente crecientes con al menos 2 puntos')
+        self.datos = datos
+        self.ejes_lista = tuple(eje.tolist() for eje in self.ejes) #para interpolar_punto, bisect sobre listas evita la sobrecarga de numpy
+        self.n_cleavy = float(n_cleavy)
+        self.n_substract = self.n_cleavy if n_substract is None else float(n_substract)
+        self.modelo = modelo
+
+    def encabezado(self):
+        ''' diccionario con todo lo necesario para reconstruir la tabla desde el archivo '''
+
+        return {'longitud_onda': self.ejes[0].tolist(), 'espesor': self.ejes[1].tolist(), 'delta_n': self.ejes[2].tolist(),
+                'n_cleavy': self.n_cleavy, 'n_substract': self.n_substract, 'modelo': self.modelo,
+                'dtype': np.dtype(self.datos.dtype).str, 'forma': list(self.datos.shape)}
+
+    def guardar(self, archivo):
+        ''' funcion que escribe la tabla en un archivo binario que cargar_tabla abre como memmap '''
+
+        with open(archivo, 'wb') as salida:
+            _escribir_encabezado(salida, self.encabezado())
+            salida.write(np.ascontiguousarray(self.datos).tobytes())
+
+    def interpolar_punto(self, longitud_onda, espesor, delta_n, polarizacion='TE', modo=0):
+        ''' funcion que interpola (multilineal) el indice efectivo en un solo punto con aritmetica escalar de Python, sin la sobrecarga fija de
+        interpolar (del orden de 150 us por llamada), para ciclos internos que consultan un punto a la vez. No calcula la cota de error
+
+        Entradas: longitud_onda, espesor, delta_n (float), polarizacion (str) y modo (int), como en interpolar
+
+        Retorna: n_efectivo (float), nan fuera de la malla o si algun nodo de la celda no tiene el modo guiado '''
+
+        if polarizacion not in polarizaciones:
+            raise ValueError(f"polarizacion desconocida: {polarizacion}, debe ser 'TE' o 'TM'")
+        columna = polarizaciones.index(polarizacion)
+        if not 0 <= modo < self.datos.shape[-1]:
+            return float('nan')
+        celdas, fracciones = [], []
+        for eje, valor in zip(self.ejes_lista, (longitud_onda, espesor, delta_n)):
+            if not eje[0] <= valor <= eje[-1]: #tambien descarta los nan
+                return float('nan')
+            i = min(bisect_right(eje, valor) - 1, len(eje) - 2)
+            celdas.append(i)
+            fracciones.append((valor - eje[i]) / (eje[i + 1] - eje[i]))
+        (i, j, k), (u, v, w) = celdas, fracciones
+        cubo = self.datos[i:i + 2, j:j + 2, k:k + 2, columna, modo].tolist() #un solo acceso a la tabla para los 8 nodos de la celda
+        return ((cubo[0][0][0] * (1 - w) + cubo[0][0][1] * w) * (1 - v) + (cubo[0][1][0] * (1 - w) + cubo[0][1][1] * w) * v) * (1 - u) + \
+               ((cubo[1][0][0] * (1 - w) + cubo[1][0][1] * w) * (1 - v) + (cubo[1][1][0] * (1 - w) + cubo[1][1][1] * w) * v) * u
+
+    def interpolar(self, longitud_onda, espesor, delta_n, polarizacion='TE', modo=0, metodo='lineal', cota=True, seguridad=2.0, tamano_bloque=65536):
+        ''' funcion que interpola el indice efectivo en muchos puntos a la vez, por bloques para no crear copias del tamano de toda la consulta.
+        Cada llamada tiene un costo fijo del orden de 150 us (300 us con la cota), asi que solo es rapida por punto (~0.6 us) en consultas grandes;
+        para consultar un punto a la vez esta interpolar_punto
+
+        Entradas:
+        longitud_onda, espesor, delta_n (float o array) == puntos de consulta, hacen broadcasting entre si
+        polarizacion (str) == 'TE' o 'TM'
+        modo (int o array) == orden global del modo, hace broadcasting con los puntos
+        metodo (str) == 'lineal' (multilineal, 8 nodos) o 'cubica' (Lagrange cubica por eje, 64 nodos)
+        cota (bool) == si es False no se calcula la cota de error (la consulta es mas rapida) y el error retornado es nan
+        seguridad (float) == factor por el que se multiplica la cota estimada
+        tamano_bloque (int) == numero de puntos que se interpolan a la vez
+
+        Retorna:
+        n_efectivo (array) == indice efectivo interpolado, nan fuera de la malla o si algun nodo usado no tiene el modo guiado
+        error (array) == cota estimada del error de la interpolacion multilineal: seguridad por la suma sobre los ejes de h^2/8 por el maximo de
+        |segunda derivada| en la celda, mas el redondeo del tipo de dato de la tabla. El maximo de |segunda derivada| se estima con las segundas
+        diferencias divididas de los 4 nodos de cada eje mas su variacion (tercera diferencia), que cubre el cambio de la curvatura dentro de la
+        celda. Al venir de muestras de la tabla no es una cota rigurosa; con seguridad=2 el error real quedo por debajo de ella en todos los puntos
+        de verificar_tabla (mallas de 6^3 a 41^3, simetricas y asimetricas, rayos y ondas, peor cociente cota/error de 1.8). Tambien acota, de
+        forma conservadora, el error de la cubica. Es nan si no se pudo estimar (nodos no guiados o ejes de menos de 4 puntos) '''
+
+        if polarizacion not in polarizaciones:
+            raise ValueError(f"polarizacion desconocida: {polarizacion}, debe ser 'TE' o 'TM'")
+        if metodo not in ('lineal', 'cubica'):
+            raise ValueError(f"metodo desconocido: {metodo}, debe ser 'lineal' o 'cubica'")
+        cubica_posible = all(eje.size >= 4 for eje in self.ejes)
+        if metodo == 'cubica' and not cubica_posible:
+            raise ValueError('la interpolacion cubica necesita al menos 4 puntos en cada eje')
+
+        puntos = np.broadcast_arrays(*[np.asarray(valor, dtype=float) for valor in (longitud_onda, espesor, delta_n)], np.asarray(modo, dtype=int))
+        forma = puntos[0].shape
+        puntos = [np.ravel(arreglo) for arreglo in puntos]
+        n_efectivo, error = np.empty(puntos[0].size), np.full(puntos[0].size, np.nan)
+        columna = polarizaciones.index(polarizacion)
+        redondeo = np.finfo(self.datos.dtype).eps if np.issubdtype(self.datos.dtype, np.floating) else 0.0
+
+        for inicio in range(0, n_efectivo.size, tamano_bloque):
+            bloque = slice(inicio, inicio + tamano_bloque)
+            longitud, grosor, delta, modos = (arreglo[bloque] for arreglo in puntos)
+            fuera = (modos < 0) | (modos >= self.datos.shape[-1])
+            modos = np.clip(modos, 0, self.datos.shape[-1] - 1)
+            orden = 4 if (metodo == 'cubica' or cota) and cubica_posible else 2 #la cota necesita los vecinos de la celda
+            ejes = [_nodos_eje(eje, valores, orden) for eje, valores in zip(self.ejes, (longitud, grosor, delta))]
+            fuera |= ejes[0][3] | ejes[1][3] | ejes[2][3]
+
+            ''' se leen los nodos de cada punto con un solo indexado: 2x2x2 (la celda) o 4x4x4 (la celda y sus vecinos) '''
+            nodos = self.datos[ejes[0][0][:, :, None, None], ejes[1][0][:, None, :, None], ejes[2][0][:, None, None, :], columna,
+                               modos[:, None, None, None]].astype(float)
+            if metodo == 'cubica':
+                pesos = [_pesos_lagrange(x, valores) for (_, x, _, _), valores in zip(ejes, (longitud, grosor, delta))]
+                valor = np.einsum('qabc,qa,qb,qc->q', nodos, *pesos)
+            else:
+                pesos = [_pesos_lagrange(np.take_along_axis(x, celda[:, None] + np.arange(2), 1), valores) for (_, x, celda, _), valores in
+                         zip(ejes, (longitud, grosor, delta))]
+                valor = np.einsum('qabc,qa,qb,qc->q', nodos if orden == 2 else _extraer_celda(nodos, ejes), *pesos)
+            valor[fuera] = np.nan
+            n_efectivo[bloque] = valor
+            if orden == 4 and cota:
+                error[bloque] = seguridad * _cota_lineal(nodos, ejes) + redondeo * np.abs(valor)
+        return n_efectivo.reshape(forma), error.reshape(forma)
+
+def _nodos_eje(eje, valores, orden):
+    ''' indices y coordenadas de los orden nodos de un eje alrededor de cada punto (2 es la celda, 4 la celda y sus vecinos), posicion de la
+    celda dentro de esos nodos y mascara de puntos fuera del eje '''
+
+    fuera = ~((valores >= eje[0]) & (valores <= eje[-1])) #tambien marca los nan
+    celda = np.clip(np.searchsorted(eje, valores, side='right') - 1, 0, eje.size - 2) #celda [eje[i], eje[i+1]] que contiene al punto
+    primero = np.clip(celda - (orden // 2 - 1), 0, eje.size - orden) #en los bordes el esquema se desplaza hacia adentro
+    indices = primero[:, None] + np.arange(orden)
+    return indices, eje[indices], celda - primero, fuera
+
+def _pesos_lagrange(nodos, valores):
+    ''' pesos de Lagrange de cada nodo para cada punto: producto de (x - x_k)/(x_j - x_k) sobre los demas nodos '''
+
+    pesos = np.ones(nodos.shape)
+    for j in range(nodos.shape[1]):
+        for k in range(nodos.shape[1]):
+            if k != j:
+                pesos[:, j] *= (valores - nodos[:, k]) / (nodos[:, j] - nodos[:, k])
+    return pesos
+
+def _extraer_celda(nodos, ejes):
+    ''' nodos 2x2x2 de la celda de cada punto a partir de los nodos 4x4x4 '''
+
+    q = np.arange(nodos.shape[0])[:, None, None, None]
+    a, b, c = (eje[2][:, None, None, None] + desplazamiento for eje, desplazamiento in
+               zip(ejes, (np.arange(2)[:, None, None], np.arange(2)[None, :, None], np.arange(2)[None, None, :])))
+    return nodos[q, a, b, c]
+
+def _cota_lineal(nodos, ejes):
+    ''' cota estimada del error de la interpolacion multilineal con los nodos 4x4x4 de cada punto: suma sobre los ejes de h^2/8 por el maximo de
+    |segunda derivada| a lo largo de ese eje, estimado como el maximo de las dos segundas diferencias divididas mas la diferencia entre ellas
+    (termino de tercera derivada, sin el la curvatura se subestima donde cambia rapido, por ejemplo cerca del corte) '''
+
+    cota = np.zeros(nodos.shape[0])
+    for eje, (_, coordenadas, celda, _) in enumerate(ejes, start=1):
+        forma = [nodos.shape[0], 1, 1, 1]
+        forma[eje] = 4
+        x = coordenadas.reshape(forma)
+        pendiente = np.diff(nodos, axis=eje) / np.diff(x, axis=eje) #primeras diferencias divididas
+        curvatura = 2 * np.diff(pendiente, axis=eje) / (np.take(x, [2, 3], axis=eje) - np.take(x, [0, 1], axis=eje))
+        maximo = np.abs(curvatura).max(axis=eje) + np.abs(np.diff(curvatura, axis=eje)).max(axis=eje)
+        ancho = (np.take_along_axis(coordenadas, celda[:, None] + 1, 1) - np.take_along_axis(coordenadas, celda[:, None], 1))[:, 0] #ancho de la celda
+        cota += ancho**2 / 8 * maximo.reshape(nodos.shape[0], -1).max(axis=1)
+    return cota
+
+def _escribir_encabezado(salida, encabezado):
+    ''' escribe la firma, la longitud y el encabezado JSON, rellenado para que los datos queden alineados '''
+
+    texto = json.dumps(encabezado).encode()
+    texto += b' ' * (-(len(firma) + 8 + len(texto)) % alineacion)
+    salida.write(firma + np.uint64(len(texto)).tobytes() + texto) #tobytes de un uint64 nativo, el formato asume little endian
+
+def construir_tabla(longitud_onda, espesor, delta_n, n_cleavy, n_substract=None, modelo='rayos', modos_max=None, archivo=None, dtype=np.float32):
+    ''' funcion que resuelve el indice efectivo sobre toda la malla con barrido_modos (una rebanada de longitud de onda a la vez) y lo guarda en
+    una tabla. Si se da un archivo, los datos se escriben directamente en el (memmap), asi que la malla puede ser mas grande que la memoria
+
+    Entradas:
+    longitud_onda, espesor, delta_n (array 1D) == ejes de la malla, estrictamente crecientes (delta_n = n_core - n_cleavy > 0)
+    n_cleavy (float) == indice de refraccion del recubrimiento
+    n_substract (float, opcional) == indice de refraccion del sustrato (por defecto el mismo del recubrimiento)
+    modelo (str) == 'rayos' u 'ondas'
+    modos_max (int, opcional) == numero de modos por polarizacion, por defecto los del punto mas multimodo de la malla
+    archivo (str, opcional) == ruta del archivo binario donde se guarda la tabla
+    dtype == tipo de dato de la tabla, float32 (la mitad del tamano, error de redondeo ~1e-7) o float64
+
+    Retorna: tabla (TablaIndiceEfectivo), respaldada por el archivo si se dio uno '''
+
+    longitud_onda, espesor, delta_n = (np.asarray(eje, dtype=float) for eje in (longitud_onda, espesor, delta_n))
+    n_substract = n_cleavy if n_substract is None else n_substract
+    if modos_max is None:
+        ''' el punto mas multimodo es el de mayor espesor y delta_n y menor longitud de onda '''
+        modos_max = int(modos_guiados.numero_modos(n_cleavy + delta_n[-1], n_cleavy, espesor[-1], longitud_onda[0], n_substract, 'TE'))
+    modos_max = max(int(modos_max), 1)
+    forma = (longitud_onda.size, espesor.size, delta_n.size, len(polarizaciones), modos_max)
+
+    if archivo is None:
+        datos = np.empty(forma, dtype=dtype)
+    else:
+        tabla = TablaIndiceEfectivo(longitud_onda, espesor, delta_n, np.empty((0,) * 5, dtype=dtype), n_cleavy, n_substract, modelo)
+        encabezado = tabla.encabezado()
+        encabezado['forma'] = list(forma)
+        with open(archivo, 'wb') as salida:
+            _escribir_encabezado(salida, encabezado)
+            desplazamiento = salida.tell()
+        datos = np.memmap(archivo, dtype=dtype, mode='r+', offset=desplazamiento, shape=forma)
+
+    for i, longitud in enumerate(longitud_onda):
+        rebanada = barrido.barrido_modos(longitud, espesor[:, None], n_cleavy + delta_n[None, :], n_cleavy, n_substract, modelo, modos_max)
+        for j, polarizacion in enumerate(polarizaciones):
+            datos[i, :, :, j, :] = rebanada[polarizacion]
+    if archivo is not None:
+        datos.flush()
+        return cargar_tabla(archivo)
+    return TablaIndiceEfectivo(longitud_onda, espesor, delta_n, datos, n_cleavy, n_substract, modelo)
+
+def cargar_tabla(archivo, modo='r'):
+    ''' funcion que abre una tabla guardada con construir_tabla o TablaIndiceEfectivo.guardar, sin leer los datos (np.memmap)
+
+    Entradas:
+    archivo (str) == ruta del archivo
+    modo (str) == modo de np.memmap, 'r' solo lectura o 'c' copia en escritura
+
+    Retorna: tabla (TablaIndiceEfectivo) '''
+
+    with open(archivo, 'rb') as entrada:
+        if entrada.read(len(firma)) != firma:
+            raise ValueError(f'{archivo} no es un archivo de tabla de indices efectivos')
+        longitud = int(np.frombuffer(entrada.read(8), dtype='<u8')[0])
+        encabezado = json.loads(entrada.read(longitud))
+        desplazamiento = entrada.tell()
+    datos = np.memmap(archivo, dtype=np.dtype(encabezado['dtype']), mode=modo, offset=desplazamiento, shape=tuple(encabezado['forma']))
+    return TablaIndiceEfectivo(encabezado['longitud_onda'], encabezado['espesor'], encabezado['delta_n'], datos, encabezado['n_cleavy'],
+                               encabezado['n_substract'], encabezado['modelo'])
+
+def verificar_tabla(tabla, n_puntos=1000, polarizacion='TE', modo=0, metodo='lineal', semilla=0):
+    ''' funcion que compara la interpolacion con el solucionador en puntos aleatorios de la malla, para comprobar la cota de error (que es una
+    estimacion, asi que conviene correrla sobre cada tabla nueva antes de confiar en la cota)
+
+    Retorna: diccionario con 'error_max' (error real maximo), 'cota_max' (cota estimada maxima) y 'dentro_cota' (fraccion de puntos cuyo error
+    real no supera la cota), calculados sobre los puntos en los que el modo es guiado en la tabla y en el solucionador '''
+
+    generador = np.random.default_rng(semilla)
+    puntos = [generador.uniform(eje[0], eje[-1], n_puntos) for eje in tabla.ejes]
+    n_efectivo, cota = tabla.interpolar(*puntos, polarizacion, modo, metodo)
+    exacto = barrido.barrido_modos(puntos[0], puntos[1], tabla.n_cleavy + puntos[2], tabla.n_cleavy, tabla.n_substract, tabla.modelo, modo + 1)[polarizacion][:, modo]
+    validos = ~np.isnan(n_efectivo) & ~np.isnan(exacto) & ~np.isnan(cota)
+    error = np.abs(n_efectivo - exacto)[validos]
+    return {'error_max': error.max(initial=0), 'cota_max': cota[validos].max(initial=0),
+            'dentro_cota': float(np.mean(error <= cota[validos])) if error.size else np.nan}
\ No newline at end of file
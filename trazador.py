@@ -0,0 +1,180 @@
+import time
+import numpy as np
+import raices
+import modos_guiados
+
+velocidad_luz = 299792458 #velocidad de la luz en el vacio (m/s)
+
+def _fase_reflexion(n_efectivo, n_core, n_externo, polarizacion):
+    ''' funcion auxiliar que calcula la fase de reflexion total interna phi = arctan(rho*q/h) en una interfaz y sus dos primeras derivadas respecto
+    al indice efectivo, con h = sqrt(n_core^2 - n_efectivo^2), q = sqrt(n_efectivo^2 - n_externo^2) y rho = 1 (TE) o (n_core/n_externo)^2 (TM)
+
+    Retorna: phi, dphi/dn, d2phi/dn2 (array) '''
+
+    rho = 1.0 if polarizacion == 'TE' else (n_core / n_externo)**2
+    h = np.sqrt(n_core**2 - n_efectivo**2)
+    q = np.sqrt(n_efectivo**2 - n_externo**2)
+    C = n_core**2 - n_externo**2 #h^2 + q^2, no depende del indice efectivo
+    t = rho * q / h
+    dt = rho * n_efectivo * C / (q * h**3)
+    d2t = rho * C * (1 / (q * h**3) - n_efectivo**2 / (q**3 * h**3) + 3 * n_efectivo**2 / (q * h**5))
+    fase = np.arctan(t)
+    dfase = dt / (1 + t**2)
+    d2fase = d2t / (1 + t**2) - 2 * t * dt**2 / (1 + t**2)**2
+    return fase, dfase, d2fase
+
+def ecuacion_indice(n_efectivo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda, polarizacion='TE'):
+    ''' ecuacion trascendente escrita en funcion del indice efectivo, g = k_0*d*h - phi_recubrimiento - phi_sustrato - modo*pi, con sus derivadas
+    analiticas. Tiene las mismas raices que las ecuaciones de optica de rayos y de optica ondulatoria
+
+    Entradas:
+    n_efectivo (array) == indice efectivo en el que se evalua la ecuacion
+    modo (array) == orden global del modo
+    n_core, n_cleavy, espesor, n_substract, longitud_onda (float o array) == parametros del guia de onda
+    polarizacion (str) == 'TE' o 'TM'
+
+    Retorna:
+    g, dg/dn, d2g/dn2 (array) == valor de la ecuacion y sus derivadas respecto al indice efectivo
+    fase_propagacion (array) == P = k_0*d, la ecuacion depende de la longitud de onda y del espesor solo a traves de P*h
+    h, dh/dn (array) == h = sqrt(n_core^2 - n_efectivo^2) y su derivada '''
+
+    fase_propagacion = 2 * np.pi / longitud_onda * espesor
+    h = np.sqrt(n_core**2 - n_efectivo**2)
+    dh = -n_efectivo / h
+    d2h = -n_core**2 / h**3
+    fase_c, dfase_c, d2fase_c = _fase_reflexion(n_efectivo, n_core, n_cleavy, polarizacion)
+    if n_substract is None or np.array_equal(n_substract, n_cleavy):
+        fase_s, dfase_s, d2fase_s = fase_c, dfase_c, d2fase_c #guia de onda simetrico, el sustrato es igual al recubrimiento
+    else:
+        fase_s, dfase_s, d2fase_s = _fase_reflexion(n_efectivo, n_core, n_substract, polarizacion)
+    g = fase_propagacion * h - fase_c - fase_s - modo * np.pi
+    dg = fase_propagacion * dh - dfase_c - dfase_s
+    d2g = fase_propagacion * d2h - d2fase_c - d2fase_s
+    return g, dg, d2g, fase_propagacion, h, dh
+
+def derivadas_longitud_onda(n_efectivo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda, polarizacion='TE'):
+    ''' funcion que calcula por derivacion implicita de la ecuacion trascendente la primera y segunda derivada del indice efectivo respecto a la
+    longitud de onda (sin dispersion del material), y con ellas el indice de grupo y la dispersion del guia de onda
+
+    Entradas: las mismas de ecuacion_indice, n_efectivo debe ser una raiz
+
+    Retorna:
+    dn/dlambda (array) == en 1/micra
+    d2n/dlambda2 (array) == en 1/micra^2
+    indice_grupo (array) == n_g = n_efectivo - lambda*dn/dlambda
+    dispersion (array) == parametro de dispersion D = -(lambda/c)*d2n/dlambda2 en ps/(nm km) '''
+
+    _, dg, d2g, fase_propagacion, h, dh = ecuacion_indice(n_efectivo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda, polarizacion)
+
+    ''' g depende de lambda solo en P*h, con dP/dlambda = -P/lambda y d2P/dlambda2 = 2P/lambda^2 '''
+    g_l = -fase_propagacion / longitud_onda * h
+    g_ll = 2 * fase_propagacion / longitud_onda**2 * h
+    g_nl = -fase_propagacion / longitud_onda * dh
+    dn = -g_l / dg
+    d2n = -(g_ll + 2 * g_nl * dn + d2g * dn**2) / dg
+    indice_grupo = n_efectivo - longitud_onda * dn
+    dispersion = -longitud_onda * d2n * 1e12 / velocidad_luz #lambda en micras y d2n en 1/micra^2 dan D en ps/(nm km)
+    return dn, d2n, indice_grupo, dispersion
+
+def _derivadas_parametro(n_efectivo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda, polarizacion, variable):
+    ''' funcion auxiliar que calcula dn/dp y d2n/dp2 respecto a la variable del barrido (longitud_onda o espesor) '''
+
+    if variable == 'longitud_onda':
+        dn, d2n, _, _ = derivadas_longitud_onda(n_efectivo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda, polarizacion)
+        return dn, d2n
+    _, dg, d2g, fase_propagacion, h, dh = ecuacion_indice(n_efectivo, modo, n_core, n_cleavy, espesor, n_substract, longitud_onda, polarizacion)
+    g_d = fase_propagacion / espesor * h #dP/dd = P/d y d2P/dd2 = 0
+    g_nd = fase_propagacion / espesor * dh
+    dn = -g_d / dg
+    d2n = -(2 * g_nd * dn + d2g * dn**2) / dg
+    return dn, d2n
+
+def trazar_dispersion(malla, n_core, n_cleavy, espesor=1, longitud_onda=1, n_substract=None, variable='longitud_onda', polarizacion='TE', modelo='rayos',
+                      tolerancia=1e-13, max_iter=20):
+    ''' funcion que traza las curvas de indice efectivo de todos los modos guiados sobre una malla de longitudes de onda (o de espesores) por
+    continuacion: cada punto parte de la raiz del punto anterior con un predictor de Taylor de segundo orden (derivadas analiticas) y se corrige
+    con el metodo de Newton. Los modos que aparecen en su corte se inician con una solucion acotada, los que dejan de ser guiados quedan en nan
+
+    Entradas:
+    malla (array) == valores de la variable del barrido, preferiblemente ordenados
+    n_core, n_cleavy (float) == indices de refraccion del nucleo y del recubrimiento
+    espesor (float) == ancho del nucleo en micras (se ignora si variable == 'espesor')
+    longitud_onda (float) == longitud de onda en micras (se ignora si variable == 'longitud_onda')
+    n_substract (float, opcional) == indice de refraccion del sustrato (por defecto es el mismo valor que el recubrimiento)
+    variable (str) == 'longitud_onda' o 'espesor', la variable que recorre la malla
+    polarizacion (str) == 'TE' o 'TM'
+    modelo (str) == 'rayos' u 'ondas', ecuacion que se usa en las soluciones acotadas (inicio de los modos y respaldo si Newton falla)
+    tolerancia (float) == tolerancia del metodo de Newton en el indice efectivo
+    max_iter (int) == numero maximo de iteraciones de Newton por punto
+
+    Retorna:
+    resultado (structured array) == un elemento por punto de la malla con los campos 'longitud_onda', 'espesor', 'n_efectivo', 'indice_grupo',
+    'dispersion' (ps/(nm km), solo dispersion del guia de onda) e 'iteraciones' (evaluaciones de la ecuacion por modo), los cuatro ultimos de
+    tamano igual al maximo numero de modos guiados en la malla (nan o 0 en los modos que no son guiados) '''
+
+    if variable not in ('longitud_onda', 'espesor'):
+        raise ValueError(f"variable desconocida: {variable}, debe ser 'longitud_onda' o 'espesor'")
+    modos_guiados.ecuacion_modo(modelo, polarizacion) #se validan el modelo y la polarizacion
+    if n_substract is None:
+        n_substract = n_cleavy #guia de onda simetrico
+    malla = np.asarray(malla, dtype=float)
+    longitudes = malla if variable == 'longitud_onda' else np.full(malla.shape, float(longitud_onda))
+    espesores = malla if variable == 'espesor' else np.full(malla.shape, float(espesor))
+
+    numero = modos_guiados.numero_modos(n_core, n_cleavy, espesores, longitudes, n_substract, polarizacion) #modos guiados en cada punto
+    modos_max = max(int(numero.max(initial=0)), 1)
+    resultado = np.zeros(malla.shape, dtype=[('longitud_onda', float), ('espesor', float), ('n_efectivo', float, (modos_max,)),
+                                             ('indice_grupo', float, (modos_max,)), ('dispersion', float, (modos_max,)), ('iteraciones', int, (modos_max,))])
+    resultado['longitud_onda'], resultado['espesor'] = longitudes, espesores
+    resultado['n_efectivo'] = np.nan
+
+    n_anterior = np.full(modos_max, np.nan) #raiz de cada modo en el punto anterior
+    dn_anterior, d2n_anterior = np.zeros(modos_max), np.zeros(modos_max) #derivadas respecto a la variable en el punto anterior
+    modos = np.arange(modos_max)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for i in range(malla.size):
+            lam, d = longitudes[i], espesores[i]
+            guiado = modos < numero[i]
+            n_efectivo = np.full(modos_max, np.nan)
+            iteraciones = np.zeros(modos_max, dtype=int)
+
+            ''' predictor: polinomio de Taylor de segundo orden desde el punto anterior '''
+            paso = malla[i] - malla[i - 1] if i > 0 else 0.0
+            prediccion = n_anterior + dn_anterior * paso + d2n_anterior * paso**2 / 2
+            continuado = guiado & np.isfinite(prediccion) & (prediccion > max(n_cleavy, n_substract)) & (prediccion < n_core)
+
+            ''' corrector: metodo de Newton sobre g(n) para los modos que vienen del punto anterior '''
+            inicio_newton = time.perf_counter() if raices.observadores else None
+            indices = np.nonzero(continuado)[0]
+            n_newton = prediccion[indices]
+            convergido = np.zeros(indices.size, dtype=bool)
+            for _ in range(max_iter):
+                activo = ~convergido
+                if not activo.any():
+                    break
+                g, dg, _, _, _, _ = ecuacion_indice(n_newton[activo], indices[activo], n_core, n_cleavy, d, n_substract, lam, polarizacion)
+                correccion = g / dg
+                n_newton[activo] -= correccion
+                iteraciones[indices[activo]] += 1
+                convergido[activo] = np.abs(correccion) <= tolerancia
+            valido = convergido & (n_newton > max(n_cleavy, n_substract)) & (n_newton < n_core)
+            if raices.observadores and indices.size:
+                g, _, _, _, _, _ = ecuacion_indice(n_newton, indices, n_core, n_cleavy, d, n_substract, lam, polarizacion)
+                raices.notificar(f'trazar_dispersion:newton-{polarizacion}', inicio_newton, iteraciones[indices], iteraciones[indices], g, valido,
+                                 (indices, np.full(indices.size, d), np.full(indices.size, lam)))
+            n_efectivo[indices[valido]] = n_newton[valido]
+
+            ''' modos nuevos (recien pasan su corte) o en los que Newton fallo: solucion acotada con el metodo de Illinois '''
+            acotados = np.nonzero(guiado & np.isnan(n_efectivo))[0]
+            if acotados.size:
+                uno = np.ones(acotados.size)
+                angulos, evaluaciones = modos_guiados.refinar_modos(acotados, n_core * uno, n_cleavy * uno, d * uno, n_substract * uno, lam * uno, polarizacion, modelo)
+                n_efectivo[acotados] = n_core * np.sin(angulos)
+                iteraciones[acotados] += evaluaciones
+
+            ''' indice de grupo y dispersion con las derivadas analiticas de la ecuacion trascendente '''
+            _, _, indice_grupo, dispersion = derivadas_longitud_onda(n_efectivo, modos, n_core, n_cleavy, d, n_substract, lam, polarizacion)
+            dn_anterior, d2n_anterior = _derivadas_parametro(n_efectivo, modos, n_core, n_cleavy, d, n_substract, lam, polarizacion, variable)
+            n_anterior = n_efectivo
+            resultado['n_efectivo'][i], resultado['indice_grupo'][i], resultado['dispersion'][i], resultado['iteraciones'][i] = n_efectivo, indice_grupo, dispersion, iteraciones
+    return resultado
\ No newline at end of file